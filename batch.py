@@ -0,0 +1,161 @@
+"""
+Generación de contenido por lotes, sin interfaz.
+
+Lee un fichero de trabajos (CSV o JSONL) con las columnas topic, audience, platform,
+tone, language y, opcionalmente, id, model y personalization_info. Los campos
+platform, tone y language admiten varios valores separados por "|" y se expanden
+en todas sus combinaciones.
+
+Uso:
+    python batch.py trabajos.csv -o resultados.jsonl --concurrency 8
+
+Los resultados se escriben en JSONL a medida que terminan. Si se vuelve a lanzar
+con el mismo fichero de salida, los trabajos ya completados se omiten.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from generador import generation, ratelimit
+
+# Campos que se expanden en combinaciones cuando contienen varios valores
+EXPANDABLE_FIELDS = ("platform", "tone", "language")
+
+
+def read_jobs(path):
+    """Lee el fichero de trabajos y devuelve la lista de trabajos ya expandidos."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    jobs = []
+    for index, row in enumerate(rows):
+        base_id = str(row.get("id") or index)
+        options = [str(row.get(field, "")).split("|") for field in EXPANDABLE_FIELDS]
+        combinations = list(itertools.product(*options))
+        for values in combinations:
+            job = dict(row, **dict(zip(EXPANDABLE_FIELDS, (value.strip() for value in values))))
+            job["id"] = base_id if len(combinations) == 1 else "-".join([base_id, *job_values(job)])
+            jobs.append(job)
+    return jobs
+
+
+def job_values(job):
+    return [job[field] for field in EXPANDABLE_FIELDS]
+
+
+def read_completed(path):
+    """Devuelve los ids ya generados correctamente en un fichero de salida previo."""
+    completed = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Última línea cortada por una interrupción
+                continue
+            if not record.get("error"):
+                completed.add(record["id"])
+    return completed
+
+
+def run_job(job, default_model, cancel_event, use_cache=True):
+    model = job.get("model") or default_model
+    prompt = generation.build_text_prompt(
+        job.get("topic", ""), job.get("audience", ""), job["platform"], job["tone"], job["language"],
+        job.get("personalization_info", ""),
+    )
+    stats = generation.GenerationStats()
+    record = {"id": job["id"], "model": model, **{k: v for k, v in job.items() if k not in ("id", "model")}}
+    try:
+        # Los lotes ceden el turno del limitador a las peticiones de la interfaz
+        with ratelimit.priority(ratelimit.BATCH):
+            text = "".join(generation.stream_completion(
+                model, prompt, generation.TEXT_MAX_NEW_TOKENS, stats=stats, cancel_event=cancel_event, use_cache=use_cache
+            ))
+        if stats.cancelled:
+            raise RuntimeError("cancelado")
+        record.update(text=text, error=None)
+    except Exception as e:
+        record.update(text=None, error=str(e))
+    record.update(
+        tokens=stats.tokens,
+        time_to_first_token=stats.time_to_first_token,
+        duration=(stats.finished_at or time.perf_counter()) - stats.started_at,
+    )
+    return record
+
+
+def run_batch(jobs_path, output_path, concurrency=4, default_model=generation.DEFAULT_MODEL, use_cache=True):
+    """
+    Ejecuta los trabajos pendientes en paralelo y añade los resultados al JSONL de salida.
+
+    Returns:
+        dict: Resumen con trabajos completados, fallidos, omitidos y throughput
+    """
+    jobs = read_jobs(jobs_path)
+    completed = read_completed(output_path)
+    pending = [job for job in jobs if job["id"] not in completed]
+
+    write_lock = threading.Lock()
+    cancel_event = threading.Event()
+    summary = {"total": len(jobs), "skipped": len(jobs) - len(pending), "succeeded": 0, "failed": 0, "tokens": 0}
+    started_at = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as output, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(run_job, job, default_model, cancel_event, use_cache) for job in pending]
+        try:
+            for future in as_completed(futures):
+                record = future.result()
+                with write_lock:
+                    # Cada línea se escribe y vuelca en cuanto termina: es el punto de control
+                    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    output.flush()
+                summary["failed" if record["error"] else "succeeded"] += 1
+                summary["tokens"] += record["tokens"]
+                print(f"[{summary['succeeded'] + summary['failed']}/{len(pending)}] {record['id']}"
+                      + (f" ERROR: {record['error']}" if record["error"] else ""), file=sys.stderr)
+        except KeyboardInterrupt:
+            # Se detienen las generaciones en curso; lo ya escrito se conserva para reanudar
+            cancel_event.set()
+            for future in futures:
+                future.cancel()
+            print("Interrumpido: vuelva a ejecutar el mismo comando para reanudar.", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started_at
+    summary["elapsed"] = elapsed
+    summary["jobs_per_minute"] = summary["succeeded"] / elapsed * 60 if elapsed > 0 else 0.0
+    summary["tokens_per_second"] = summary["tokens"] / elapsed if elapsed > 0 else 0.0
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera contenido por lotes a partir de un fichero CSV o JSONL.")
+    parser.add_argument("jobs", help="Fichero de trabajos (.csv o .jsonl)")
+    parser.add_argument("-o", "--output", default="resultados.jsonl", help="Fichero JSONL de resultados")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Generaciones simultáneas")
+    parser.add_argument("-m", "--model", default=generation.DEFAULT_MODEL, help="Modelo por defecto")
+    parser.add_argument("--no-cache", action="store_true", help="No reutilizar generaciones cacheadas")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.jobs, args.output, concurrency=args.concurrency, default_model=args.model, use_cache=not args.no_cache)
+    print(
+        f"{summary['succeeded']} completados, {summary['failed']} fallidos, {summary['skipped']} omitidos "
+        f"en {summary['elapsed']:.1f} s · {summary['jobs_per_minute']:.1f} trabajos/min · "
+        f"{summary['tokens_per_second']:.1f} tokens/s"
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
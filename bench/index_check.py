@@ -0,0 +1,66 @@
+"""
+Comprobación del índice local de arXiv con los artículos grabados en bench/fixtures.
+
+Uso (desde la raíz del repositorio):
+    python -m bench.index_check
+
+Indexa dos recuperaciones de "física cuántica" (artículos sobre corrección de errores
+cuánticos) y verifica que:
+
+* la misma consulta escrita de otras formas se responde en local,
+* consultas nuevas que cubren los artículos indexados ("quantum error correction")
+  también se responden en local, con vecinos, y
+* consultas distintas que comparten palabras ("física médica", "quantum chemistry")
+  van a arXiv.
+
+Usa los vectores por hashing (sin ARXIV_INDEX_EMBEDDING_MODEL). Devuelve 1 si algo falla.
+"""
+import os
+import sys
+import tempfile
+
+from bench.stubs import FIXTURES_DIR
+
+# Consultas que deben responderse con el índice: la ya hecha y otras que cubren sus artículos
+LOCAL = (
+    "física cuántica", "Fisica cuantica", "  FÍSICA   CUÁNTICA ",
+    "quantum error correction", "error correction for quantum processors",
+    "near-term quantum processors", "logical qubits",
+)
+# Consultas que deben ir a arXiv aunque compartan palabras con lo indexado
+REMOTE = (
+    "física médica", "física teórica", "física estadística", "física de materiales",
+    "física", "quantum chemistry", "superconducting materials", "medical physics",
+    "deep learning", "quantum",
+)
+
+
+def main(argv=None):
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["ARXIV_INDEX"] = "1"
+        os.environ["ARXIV_INDEX_DIR"] = directory
+        os.environ.pop("ARXIV_INDEX_EMBEDDING_MODEL", None)
+        from generador import arxiv_index
+        from generador.fetchers.arxiv import parse_arxiv_feed
+
+        with open(os.path.join(FIXTURES_DIR, "arxiv.xml"), "rb") as f:
+            articles = list(parse_arxiv_feed(f))
+        arxiv_index.remember("física cuántica", articles[:3])
+        arxiv_index.remember("física cuántica", articles[3:6])
+
+        failures = []
+        for query in LOCAL:
+            if arxiv_index.lookup(query, 3) is None:
+                failures.append(f"{query!r} debería responderse en local")
+        for query in REMOTE:
+            if arxiv_index.lookup(query, 3) is not None:
+                failures.append(f"{query!r} no debería responderse en local")
+
+    for failure in failures:
+        print(f"FALLO: {failure}")
+    print(f"{len(LOCAL) + len(REMOTE) - len(failures)}/{len(LOCAL) + len(REMOTE)} consultas correctas")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,353 @@
+"""
+Prueba de carga: N sesiones simultáneas de Streamlit recorriendo las vistas contra los stubs locales.
+
+Uso (desde la raíz del repositorio):
+    python -m bench.load --sessions 1,2,4,8,16,32 --duration 30 --warm
+    python -m bench.load --sessions 8 --think 0 --views news,indices --json carga.json
+
+Cada sesión es un AppTest de Streamlit propio (con su session_state y sus fragmentos)
+que se ejecuta en un hilo del mismo proceso, como las sesiones del servidor: elige una
+vista al azar, la abre con el botón del menú, usa su acción principal (actualizar,
+mostrar el perfil de AAPL, generar) y espera un tiempo de reflexión. La latencia de una
+vista es la de esos dos reruns completos del script. El número de sesiones sube por
+escalones; en cada uno se miden la latencia por vista, el throughput y el CPU y la
+memoria del proceso repartidos por sesión. El punto de saturación es el primer
+escalón en el que el throughput deja de crecer, el p95 supera el objetivo o los
+errores pasan del máximo permitido.
+
+No se incluye el websocket: AppTest recoge los mensajes de la página en memoria.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+from bench.run import VIEWS, configure_environment, disable_rate_limits, percentile
+from bench.stubs import StubServer, load_config
+from generador.views import VIEWS as APP_VIEWS
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app21.py")
+# Tiempo máximo de un rerun del script antes de contarlo como error (s)
+APP_TIMEOUT = 60
+# Botón del menú de cada vista del benchmark (la científica se llama distinto en la aplicación)
+_LABELS = {key: label for key, label, _ in APP_VIEWS}
+MENU = {view: _LABELS["scientific_content" if view == "scientific" else view] for view in VIEWS}
+
+
+def rss_bytes():
+    """Memoria residente actual del proceso (pico, si /proc no está disponible)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def share_app_test_runtime():
+    """
+    Permite ejecutar varios AppTest en paralelo en el mismo proceso.
+
+    Cada AppTest.run() instala un Runtime simulado al empezar y lo retira al terminar,
+    así que la primera sesión que termina dejaría sin Runtime al resto a mitad de su
+    rerun. Mientras dure la prueba se sigue devolviendo el último instalado.
+    """
+    from streamlit.runtime.runtime import Runtime
+
+    installed = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            installed[:] = [cls._instance]
+            return cls._instance
+        if installed:
+            return installed[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    def exists(cls):
+        return cls._instance is not None or bool(installed)
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+    # Crear un AppTest fuera de un rerun avisa de que falta el contexto del script en cada sesión
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+        lambda record: "missing ScriptRunContext" not in str(record.msg)
+    )
+
+
+def new_session():
+    """Sesión nueva con la página inicial ya cargada."""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_SCRIPT, default_timeout=APP_TIMEOUT)
+    rerun(app)
+    return app
+
+
+def rerun(app):
+    """Ejecuta el script con el estado actual de los widgets y falla si la página muestra un error."""
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    if app.error:
+        raise RuntimeError(app.error[0].value)
+
+
+def _button(app, label):
+    for button in app.button:
+        if button.label == label:
+            return button
+    raise LookupError(f"la página no muestra el botón {label!r}")
+
+
+def _labelled(widgets, prefix):
+    for widget in widgets:
+        if widget.label.startswith(prefix):
+            return widget
+    raise LookupError(f"la página no muestra el campo {prefix!r}")
+
+
+def use_view(app, view, warm):
+    """Pulsa la acción principal de la vista abierta, rellenando antes sus campos."""
+    if view == "news":
+        _button(app, "Actualizar noticias").click()
+    elif view == "indices":
+        _button(app, "Actualizar índices").click()
+    elif view == "profile":
+        _labelled(app.text_input, "Símbolo").input("AAPL")
+        _button(app, "Mostrar Perfil").click()
+    else:
+        if view == "content":
+            _labelled(app.text_input, "Tema").input("Inteligencia artificial en marketing")
+            _labelled(app.text_input, "Audiencia").input("Directivos")
+        else:
+            _labelled(app.text_input, "Área científica").input("física cuántica")
+        # En frío cada generación llega al endpoint de inferencia
+        _labelled(app.checkbox, "Generar una versión nueva").set_value(not warm)
+        _button(app, "Generar").click()
+    rerun(app)
+
+
+def visit(app, view, warm):
+    """Abre `view` desde el menú y usa su acción principal (dos reruns del script)."""
+    _button(app, MENU[view]).click()
+    rerun(app)
+    use_view(app, view, warm)
+
+
+def run_session(index, views, think, warm, stop, samples, seed):
+    """Bucle de una sesión simulada; añade (vista, latencia, error) a `samples`."""
+    rng = random.Random(seed + index)
+    # Las sesiones no arrancan todas a la vez
+    if stop.wait(rng.uniform(0, min(think, 1.0)) if think > 0 else 0):
+        return
+    try:
+        app = new_session()
+    except Exception as e:
+        samples.append((None, 0.0, f"{type(e).__name__}: {e}"))
+        return
+    while not stop.is_set():
+        view = rng.choice(views)
+        started_at = time.perf_counter()
+        try:
+            visit(app, view, warm)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        samples.append((view, time.perf_counter() - started_at, error))
+        if think > 0 and stop.wait(rng.expovariate(1 / think)):
+            return
+
+
+def run_stage(sessions, views, duration, think, warm, seed):
+    """Mantiene `sessions` sesiones durante `duration` segundos y resume lo medido."""
+    samples = []
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=run_session, args=(i, views, think, warm, stop, samples, seed),
+            name=f"session-{i}", daemon=True,
+        )
+        for i in range(sessions)
+    ]
+    rss_before = rss_bytes()
+    cpu_before = time.process_time()
+    started_at = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    stop.wait(duration)
+    rss_during = rss_bytes()
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started_at
+    cpu = time.process_time() - cpu_before
+
+    latencies = [latency for _, latency, error in samples if error is None]
+    errors = [error for _, _, error in samples if error is not None]
+    per_view = {}
+    for view in views:
+        view_latencies = [latency for name, latency, error in samples if name == view and error is None]
+        per_view[view] = {
+            "requests": sum(1 for name, _, _ in samples if name == view),
+            "p50": percentile(view_latencies, 0.50),
+            "p95": percentile(view_latencies, 0.95),
+            "p99": percentile(view_latencies, 0.99),
+        }
+    return {
+        "sessions": sessions,
+        "requests": len(samples),
+        "errors": len(errors),
+        "error_rate": len(errors) / len(samples) if samples else 0.0,
+        "first_error": errors[0] if errors else None,
+        "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        # Núcleos de CPU ocupados por sesión y memoria que crece con cada sesión
+        "cpu_per_session": cpu / elapsed / sessions if elapsed > 0 else 0.0,
+        "cpu_total": cpu / elapsed if elapsed > 0 else 0.0,
+        "rss": rss_during,
+        "rss_per_session": max(0, rss_during - rss_before) / sessions,
+        "views": per_view,
+    }
+
+
+def saturation_reason(stage, previous, slo, max_error_rate, min_gain):
+    """Motivo por el que el escalón está saturado, o None."""
+    if stage["error_rate"] > max_error_rate:
+        return f"errores {stage['error_rate']:.1%} > {max_error_rate:.1%}"
+    if stage["p95"] is not None and stage["p95"] > slo:
+        return f"p95 {stage['p95']:.2f} s > {slo:g} s"
+    if previous is not None and stage["throughput"] < previous["throughput"] * (1 + min_gain):
+        return f"throughput {stage['throughput']:.1f} vistas/s sin crecer (antes {previous['throughput']:.1f})"
+    return None
+
+
+def format_report(stages, views, saturation):
+    def ms(value):
+        return f"{value * 1000:8.1f}" if value is not None else "       -"
+
+    lines = [
+        f"{'sesiones':>8}{'vistas':>8}{'errores':>9}{'vistas/s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'CPU/ses':>9}{'MB/ses':>8}{'RSS MB':>8}"
+    ]
+    for stage in stages:
+        lines.append(
+            f"{stage['sessions']:>8}{stage['requests']:>8}{stage['errors']:>9}{stage['throughput']:>10.1f} "
+            f"{ms(stage['p50'])} {ms(stage['p95'])}{stage['cpu_per_session']:>9.1%}"
+            f"{stage['rss_per_session'] / 2**20:>8.2f}{stage['rss'] / 2**20:>8.0f}"
+        )
+        if stage["first_error"]:
+            lines.append(f"    primer error: {stage['first_error']}")
+
+    lines.append("")
+    lines.append("p95 por vista (ms)")
+    lines.append(f"{'sesiones':>8}" + "".join(f"{view:>12}" for view in views))
+    for stage in stages:
+        lines.append(f"{stage['sessions']:>8}" + "".join(f"{ms(stage['views'][view]['p95']):>12}" for view in views))
+
+    lines.append("")
+    if saturation["sessions"] is None:
+        lines.append(f"Sin saturación hasta {stages[-1]['sessions']} sesiones.")
+    else:
+        lines.append(f"Saturación con {saturation['sessions']} sesiones: {saturation['reason']}.")
+        if saturation["capacity"]:
+            lines.append(f"Capacidad: {saturation['capacity']} sesiones por proceso.")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga con sesiones de Streamlit simultáneas contra stubs locales.")
+    parser.add_argument("--views", default=",".join(VIEWS), help=f"Vistas separadas por comas ({', '.join(VIEWS)})")
+    parser.add_argument("--sessions", default="1,2,4,8,16,32", help="Escalones de sesiones simultáneas")
+    parser.add_argument("--duration", type=float, default=20, help="Segundos por escalón")
+    parser.add_argument("--think", type=float, default=1.0, help="Tiempo medio de reflexión entre vistas (s)")
+    parser.add_argument("--slo", type=float, default=2.0, help="p95 máximo aceptable (s)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Proporción máxima de errores")
+    parser.add_argument("--min-gain", type=float, default=0.1, help="Crecimiento mínimo del throughput entre escalones")
+    parser.add_argument("--keep-going", action="store_true", help="Seguir subiendo tras la saturación")
+    parser.add_argument("--rate-limits", action="store_true", help="Aplicar las cuotas de NewsAPI, FMP, Pixabay, arXiv y HF (RATE_LIMIT_*)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, help="Latencia base de los stubs (s)")
+    parser.add_argument("--jitter", type=float, help="Variación aleatoria de la latencia (s)")
+    parser.add_argument("--error-rate", type=float, help="Proporción de respuestas 503")
+    parser.add_argument("--token-interval", type=float, help="Tiempo entre tokens del stub de inferencia (s)")
+    parser.add_argument("--config", help="JSON con la configuración por servicio de los stubs")
+    parser.add_argument("--warm", action="store_true", help="Generar con la caché de generaciones y el índice de arXiv")
+    parser.add_argument("--json", help="Guardar los resultados en este fichero")
+    args = parser.parse_args(argv)
+
+    views = [view.strip() for view in args.views.split(",") if view.strip()]
+    unknown = set(views) - set(VIEWS)
+    if unknown:
+        parser.error(f"vistas desconocidas: {', '.join(sorted(unknown))}")
+    try:
+        steps = sorted({int(step) for step in args.sessions.split(",") if step.strip()})
+    except ValueError:
+        parser.error("--sessions debe ser una lista de enteros separados por comas")
+    if not steps or steps[0] < 1:
+        parser.error("--sessions necesita al menos un escalón mayor que 0")
+
+    config = load_config(
+        args.config, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, token_interval=args.token_interval,
+    )
+    stages = []
+    saturation = {"sessions": None, "reason": None, "capacity": None}
+    with StubServer(config) as stubs, tempfile.TemporaryDirectory() as cache_dir:
+        configure_environment(stubs, cache_dir, warm=args.warm)
+        from generador.fetchers import markets
+        from generador.ratelimit import limiter
+        from bench.yahoo import YahooStandIn
+
+        # yfinance no permite cambiar su URL: se sustituye por el cliente de los stubs
+        markets.yf = YahooStandIn(os.environ["YAHOO_CHART_URL"])
+        if not args.rate_limits:
+            disable_rate_limits()
+        rate_limited = sorted(limiter.buckets)
+        print(f"cuotas aplicadas: {', '.join(rate_limited) or 'ninguna'}", file=sys.stderr)
+        share_app_test_runtime()
+        # Calentamiento fuera de la medida: importa la aplicación y cada vista una vez
+        app = new_session()
+        for view in views:
+            try:
+                visit(app, view, args.warm)
+            except Exception:
+                # Los errores de los stubs se cuentan en los escalones, no aquí
+                pass
+        for sessions in steps:
+            stage = run_stage(sessions, views, args.duration, args.think, args.warm, args.seed)
+            print(
+                f"{sessions} sesiones: {stage['throughput']:.1f} vistas/s, "
+                f"p95 {(stage['p95'] or 0) * 1000:.0f} ms, {stage['errors']} errores",
+                file=sys.stderr,
+            )
+            reason = saturation_reason(
+                stage, stages[-1] if stages else None, args.slo, args.max_error_rate, args.min_gain
+            )
+            stages.append(stage)
+            if reason and saturation["sessions"] is None:
+                saturation = {
+                    "sessions": sessions,
+                    "reason": reason,
+                    "capacity": stages[-2]["sessions"] if len(stages) > 1 else None,
+                }
+                if not args.keep_going:
+                    break
+
+    print(format_report(stages, views, saturation))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"stages": stages, "saturation": saturation, "rate_limited": rate_limited}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
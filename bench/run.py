@@ -0,0 +1,185 @@
+"""
+Benchmark offline de las vistas de la aplicación contra los stubs locales.
+
+Uso (desde la raíz del repositorio):
+    python -m bench.run --iterations 50 --concurrency 4
+    python -m bench.run --views news,indices --latency 0.2 --error-rate 0.05
+    python -m bench.run --config bench/profiles.json --json resultados.json
+
+Cada vista ejecuta la misma lógica que su vista en generador/views (sin Streamlit) y se
+informan los percentiles p50/p95/p99 de latencia y el throughput.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.stubs import StubServer, load_config
+
+VIEWS = ("content", "news", "profile", "indices", "scientific")
+
+
+def percentile(values, q):
+    """Percentil por interpolación lineal sobre los valores ordenados."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def configure_environment(stubs, cache_dir, warm=False):
+    """Redirige la aplicación a los stubs; debe llamarse antes de importar sus módulos."""
+    os.environ.update(stubs.environment())
+    os.environ["CACHE_DIR"] = cache_dir
+    # En frío tampoco se responde desde el índice local de arXiv
+    os.environ["ARXIV_INDEX"] = "1" if warm else "0"
+    os.environ["ARXIV_PAGE_DELAY"] = "0"
+    # Sin acceso al Hub los tokens del contexto científico se estiman
+    os.environ.setdefault("CONTEXT_TOKENIZER", "none")
+    os.environ.setdefault("HTTP_BACKOFF_FACTOR", "0.05")
+
+
+def disable_rate_limits():
+    """Quita las cuotas de los proveedores: los stubs no las tienen y se mediría el limitador."""
+    from generador.ratelimit import limiter
+
+    limiter.buckets.clear()
+
+
+def build_scenarios(warm=False):
+    """Devuelve {vista: función} con la lógica de cada pantalla."""
+    from generador import generation
+    from generador.fetchers import arxiv, images, markets, news, profiles
+    from bench.yahoo import YahooStandIn
+
+    markets.yf = YahooStandIn(os.environ["YAHOO_CHART_URL"])
+
+    def fetcher(func):
+        # En frío se salta la caché para medir siempre la llamada al servicio
+        return func if warm else func.uncached
+
+    def stream(model, prompt, max_new_tokens):
+        stats = generation.GenerationStats()
+        text = "".join(generation.stream_completion(model, prompt, max_new_tokens, stats=stats, use_cache=warm))
+        return text, stats
+
+    def content():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            found_images = executor.submit(images.fetch_image_from_pixabay, "mercados financieros")
+            prompt = generation.build_text_prompt(
+                "Inteligencia artificial en marketing", "Directivos", "LinkedIn", "Formal", "Español", ""
+            )
+            _, stats = stream(generation.DEFAULT_MODEL, prompt, generation.TEXT_MAX_NEW_TOKENS)
+            found_images.result()
+        return {"ttft": stats.time_to_first_token}
+
+    def news_view():
+        fetcher(news.fetch_financial_news)()
+
+    def profile():
+        fetcher(profiles.fetch_company_profile)("AAPL")
+
+    def indices():
+        fetcher(markets.fetch_stock_indices)()
+
+    def scientific():
+        articles = fetcher(arxiv.fetch_arxiv_articles)("física cuántica", max_results=3)
+        prompt = generation.build_scientific_prompt("física cuántica", articles, "", "Español")
+        _, stats = stream(generation.SCIENTIFIC_MODEL, prompt, generation.SCIENTIFIC_MAX_NEW_TOKENS)
+        return {"ttft": stats.time_to_first_token}
+
+    return {"content": content, "news": news_view, "profile": profile, "indices": indices, "scientific": scientific}
+
+
+def run_view(scenario, iterations, concurrency):
+    """Ejecuta `iterations` veces el escenario con `concurrency` en paralelo."""
+    def timed_call(_):
+        started_at = time.perf_counter()
+        try:
+            extra = scenario() or {}
+            error = None
+        except Exception as e:
+            extra, error = {}, f"{type(e).__name__}: {e}"
+        return time.perf_counter() - started_at, extra, error
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed_call, range(iterations)))
+    elapsed = time.perf_counter() - started_at
+
+    latencies = [latency for latency, _, error in results if error is None]
+    ttfts = [extra["ttft"] for _, extra, error in results if error is None and extra.get("ttft") is not None]
+    errors = [error for _, _, error in results if error is not None]
+    return {
+        "iterations": iterations,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "ttft_p50": percentile(ttfts, 0.50),
+        "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def format_report(report):
+    def ms(value):
+        return f"{value * 1000:8.1f}" if value is not None else "       -"
+
+    lines = [f"{'vista':<12}{'iter':>6}{'errores':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'ttft ms':>9}{'ops/s':>9}"]
+    for view, result in report.items():
+        lines.append(
+            f"{view:<12}{result['iterations']:>6}{result['errors']:>9} {ms(result['p50'])} {ms(result['p95'])} "
+            f"{ms(result['p99'])} {ms(result['ttft_p50'])}{result['throughput']:>9.1f}"
+        )
+        if result["first_error"]:
+            lines.append(f"    primer error: {result['first_error']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline de las vistas contra stubs locales.")
+    parser.add_argument("--views", default=",".join(VIEWS), help=f"Vistas separadas por comas ({', '.join(VIEWS)})")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, help="Latencia base de los stubs (s)")
+    parser.add_argument("--jitter", type=float, help="Variación aleatoria de la latencia (s)")
+    parser.add_argument("--error-rate", type=float, help="Proporción de respuestas 503")
+    parser.add_argument("--token-interval", type=float, help="Tiempo entre tokens del stub de inferencia (s)")
+    parser.add_argument("--config", help="JSON con la configuración por servicio de los stubs")
+    parser.add_argument("--warm", action="store_true", help="Usar las cachés de la aplicación")
+    parser.add_argument("--rate-limits", action="store_true", help="Aplicar las cuotas de NewsAPI, FMP, Pixabay, arXiv y HF (RATE_LIMIT_*)")
+    parser.add_argument("--json", help="Guardar los resultados en este fichero")
+    args = parser.parse_args(argv)
+
+    views = [view.strip() for view in args.views.split(",") if view.strip()]
+    unknown = set(views) - set(VIEWS)
+    if unknown:
+        parser.error(f"vistas desconocidas: {', '.join(sorted(unknown))}")
+
+    config = load_config(
+        args.config, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, token_interval=args.token_interval,
+    )
+    with StubServer(config) as stubs, tempfile.TemporaryDirectory() as cache_dir:
+        configure_environment(stubs, cache_dir, warm=args.warm)
+        scenarios = build_scenarios(warm=args.warm)
+        if not args.rate_limits:
+            disable_rate_limits()
+        report = {view: run_view(scenarios[view], args.iterations, args.concurrency) for view in views}
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if any(result["errors"] == result["iterations"] for result in report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
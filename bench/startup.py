@@ -0,0 +1,119 @@
+"""
+Benchmark del arranque en frío: tiempo de importación de la aplicación y de cada vista.
+
+Uso (desde la raíz del repositorio):
+    python -m bench.startup --repeat 5
+    python -m bench.startup --first-paint
+
+Cada medida se toma en un intérprete nuevo, sin módulos ya cargados. Con --first-paint
+se mide además con el AppTest de Streamlit el primer renderizado de la página inicial
+y el de cada vista abierta directamente, con las APIs servidas por los stubs locales.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from bench.run import percentile
+from generador.views import ADMIN_VIEWS, VIEWS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORT_SCRIPT = """
+import sys, time
+started_at = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started_at
+heavy = [name for name in ("yfinance", "pandas", "huggingface_hub", "requests") if name in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+_FIRST_PAINT_SCRIPT = """
+import time
+from streamlit.testing.v1 import AppTest
+started_at = time.perf_counter()
+AppTest.from_file("app21.py", default_timeout=60).run()
+print(time.perf_counter() - started_at)
+"""
+
+_VIEW_PAINT_SCRIPT = """
+import os, tempfile, time
+from bench.run import configure_environment
+from bench.stubs import StubServer
+stubs = StubServer().start()
+configure_environment(stubs, tempfile.mkdtemp(), warm=True)
+os.environ["PREFETCH"] = "0"
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app21.py", default_timeout=60)
+app.session_state["current_view"] = "{view}"
+started_at = time.perf_counter()
+if "{view}" == "indices":
+    # yfinance no permite cambiar su URL: se sustituye por el cliente de los stubs al abrir la vista
+    from generador.fetchers import markets
+    from bench.yahoo import YahooStandIn
+    markets.yf = YahooStandIn(os.environ["YAHOO_CHART_URL"])
+app.run()
+print(time.perf_counter() - started_at, len(app.exception))
+"""
+
+
+def _run(script):
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout.strip().splitlines()[-1]
+    return output.split(" ")
+
+
+def measure_import(module, repeat):
+    """Mediana del tiempo de importación de `module` y módulos pesados que arrastra."""
+    times, heavy = [], ""
+    for _ in range(repeat):
+        elapsed, *loaded = _run(_IMPORT_SCRIPT.format(module=module))
+        times.append(float(elapsed))
+        heavy = loaded[0] if loaded else ""
+    return {"p50": percentile(times, 0.5), "max": max(times), "loaded": heavy}
+
+
+def measure_first_paint(repeat):
+    return percentile([float(_run(_FIRST_PAINT_SCRIPT)[0]) for _ in range(repeat)], 0.5)
+
+
+def measure_view_paint(view, repeat):
+    """Mediana del primer renderizado con `view` abierta y errores que mostró la vista."""
+    times, errors = [], 0
+    for _ in range(repeat):
+        elapsed, exceptions = _run(_VIEW_PAINT_SCRIPT.format(view=view))
+        times.append(float(elapsed))
+        errors += int(exceptions)
+    return {"p50": percentile(times, 0.5), "max": max(times), "errors": errors}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el arranque en frío de la aplicación.")
+    parser.add_argument("--repeat", type=int, default=3, help="Intérpretes nuevos por medida")
+    parser.add_argument("--first-paint", action="store_true", help="Medir también el primer renderizado de cada página (requiere streamlit)")
+    parser.add_argument("--json", help="Guardar los resultados en este fichero")
+    args = parser.parse_args(argv)
+
+    modules = ["generador.app"] + [f"generador.views.{module}" for _, _, module in VIEWS + ADMIN_VIEWS]
+    report = {module: measure_import(module, args.repeat) for module in modules}
+    print(f"{'módulo':<36}{'p50 ms':>9}{'máx ms':>9}  dependencias cargadas")
+    for module, result in report.items():
+        print(f"{module:<36}{result['p50'] * 1000:>9.1f}{result['max'] * 1000:>9.1f}  {result['loaded'] or '-'}")
+    if args.first_paint:
+        report["first_paint"] = measure_first_paint(args.repeat)
+        print(f"primer renderizado de la página inicial: {report['first_paint'] * 1000:.1f} ms")
+        report["view_first_paint"] = {key: measure_view_paint(key, args.repeat) for key, _, _ in VIEWS}
+        print(f"{'vista':<36}{'p50 ms':>9}{'máx ms':>9}  errores")
+        for key, result in report["view_first_paint"].items():
+            print(f"{key:<36}{result['p50'] * 1000:>9.1f}{result['max'] * 1000:>9.1f}  {result['errors']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Servidores locales que sustituyen a las APIs externas durante los benchmarks.
+
+Un único servidor HTTP atiende todas las rutas y reproduce las respuestas grabadas
+de bench/fixtures con latencia, jitter y tasa de errores configurables por servicio:
+
+    /pixabay/api/                  Pixabay
+    /newsapi/v2/everything         NewsAPI
+    /fmp/api/v3/profile/<símbolo>  Financial Modeling Prep
+    /arxiv/api/query               arXiv (feed Atom, respeta start y max_results)
+    /yahoo/v8/finance/chart/<sím>  Yahoo Finance (gráfico diario)
+    /hf                            Endpoint de inferencia compatible con TGI, con streaming SSE
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.etree import ElementTree
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+ElementTree.register_namespace("", ATOM_NS)
+ElementTree.register_namespace("arxiv", "http://arxiv.org/schemas/atom")
+ElementTree.register_namespace("opensearch", "http://a9.com/-/spec/opensearch/1.1/")
+
+# Comportamiento por defecto de cada servicio; "token_interval" solo aplica a /hf en streaming
+DEFAULT_PROFILE = {"latency": 0.05, "jitter": 0.02, "error_rate": 0.0, "token_interval": 0.01}
+SERVICES = ("pixabay", "newsapi", "fmp", "arxiv", "yahoo", "hf")
+
+
+def _load_fixture(name, binary=False):
+    with open(os.path.join(FIXTURES_DIR, name), "rb" if binary else "r", **({} if binary else {"encoding": "utf-8"})) as f:
+        return f.read()
+
+
+class StubConfig:
+    """Latencia, jitter y tasa de errores por servicio."""
+
+    def __init__(self, default=None, overrides=None, seed=None):
+        self.default = dict(DEFAULT_PROFILE, **(default or {}))
+        self.overrides = overrides or {}
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def profile(self, service):
+        return dict(self.default, **self.overrides.get(service, {}))
+
+    def delay(self, service):
+        profile = self.profile(service)
+        with self._lock:
+            jitter = self.random.uniform(-profile["jitter"], profile["jitter"])
+        return max(0.0, profile["latency"] + jitter)
+
+    def should_fail(self, service):
+        with self._lock:
+            return self.random.random() < self.profile(service)["error_rate"]
+
+
+class _Fixtures:
+    def __init__(self):
+        self.pixabay = _load_fixture("pixabay.json", binary=True)
+        self.newsapi = _load_fixture("newsapi.json", binary=True)
+        self.fmp_profile = json.loads(_load_fixture("fmp_profile.json"))
+        self.yahoo_chart = json.loads(_load_fixture("yahoo_chart.json"))
+        self.completion = _load_fixture("completion.txt")
+        feed = ElementTree.fromstring(_load_fixture("arxiv.xml", binary=True))
+        self.arxiv_entries = feed.findall(f"{{{ATOM_NS}}}entry")
+        for entry in self.arxiv_entries:
+            feed.remove(entry)
+        self.arxiv_feed = feed
+
+    def arxiv(self, start, max_results, total=1000):
+        # Las entradas grabadas se repiten con ids distintos para poder paginar
+        feed = ElementTree.Element(self.arxiv_feed.tag, self.arxiv_feed.attrib)
+        feed.extend(list(self.arxiv_feed))
+        for position in range(start, min(start + max_results, total)):
+            entry = ElementTree.fromstring(ElementTree.tostring(self.arxiv_entries[position % len(self.arxiv_entries)]))
+            entry.find(f"{{{ATOM_NS}}}id").text = f"http://arxiv.org/abs/2405.{position:05d}v1"
+            feed.append(entry)
+        return b'<?xml version="1.0" encoding="UTF-8"?>\n' + ElementTree.tostring(feed)
+
+    def tokens(self, max_new_tokens):
+        # Se trocea la respuesta grabada conservando los espacios, como hace un tokenizador
+        pieces = re.findall(r"\s*\S+", self.completion)
+        return pieces[:max_new_tokens]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = None
+    fixtures = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _simulate(self, service):
+        time.sleep(self.config.delay(service))
+        if self.config.should_fail(service):
+            self._send(503, b'{"error": "stub: servicio no disponible"}')
+            return False
+        return True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        path = url.path
+        if path.startswith("/pixabay/"):
+            if self._simulate("pixabay"):
+                self._send(200, self.fixtures.pixabay)
+        elif path.startswith("/newsapi/"):
+            if self._simulate("newsapi"):
+                self._send(200, self.fixtures.newsapi)
+        elif path.startswith("/fmp/api/v3/profile/"):
+            if self._simulate("fmp"):
+                symbols = path.rsplit("/", 1)[-1].split(",")
+                profiles = [dict(self.fixtures.fmp_profile[0], symbol=symbol) for symbol in symbols if symbol]
+                self._send(200, json.dumps(profiles).encode("utf-8"))
+        elif path.startswith("/arxiv/"):
+            if self._simulate("arxiv"):
+                start = int(query.get("start", ["0"])[0])
+                max_results = int(query.get("max_results", ["10"])[0])
+                self._send(200, self.fixtures.arxiv(start, max_results), "application/atom+xml; charset=utf-8")
+        elif path.startswith("/yahoo/v8/finance/chart/"):
+            if self._simulate("yahoo"):
+                chart = json.loads(json.dumps(self.fixtures.yahoo_chart))
+                chart["chart"]["result"][0]["meta"]["symbol"] = path.rsplit("/", 1)[-1]
+                self._send(200, json.dumps(chart).encode("utf-8"))
+        else:
+            self._send(404, b'{"error": "ruta desconocida"}')
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+        if not urlsplit(self.path).path.startswith("/hf"):
+            self._send(404, b'{"error": "ruta desconocida"}')
+            return
+        if not self._simulate("hf"):
+            return
+        payload = json.loads(body or b"{}")
+        parameters = payload.get("parameters") or {}
+        tokens = self.fixtures.tokens(int(parameters.get("max_new_tokens") or 2000))
+        text = "".join(tokens)
+        if payload.get("stream"):
+            self._stream_tokens(tokens, text)
+            return
+        details = {"finish_reason": "eos_token", "generated_tokens": len(tokens), "seed": None, "prefill": [], "tokens": []}
+        self._send(200, json.dumps([{"generated_text": text, "details": details}]).encode("utf-8"))
+
+    def _stream_tokens(self, tokens, text):
+        # Server-Sent Events en chunked encoding, con el mismo formato que TGI
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        interval = self.config.profile("hf")["token_interval"]
+        try:
+            for index, token in enumerate(tokens):
+                last = index == len(tokens) - 1
+                event = {
+                    "index": index,
+                    "token": {"id": index, "text": token, "logprob": 0.0, "special": False},
+                    "generated_text": text if last else None,
+                    "details": {"finish_reason": "eos_token", "generated_tokens": len(tokens), "seed": None} if last else None,
+                }
+                data = f"data:{json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+                time.sleep(interval)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente canceló la generación
+            self.close_connection = True
+
+
+class StubServer:
+    """Servidor de stubs en un hilo propio; `base_url` apunta a él una vez arrancado."""
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        handler = type("StubHandler", (_StubHandler,), {"config": config or StubConfig(), "fixtures": _Fixtures()})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True, name="stubs")
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self):
+        """Variables de entorno que redirigen la aplicación a este servidor."""
+        return {
+            "PIXABAY_API_URL": f"{self.base_url}/pixabay/api/",
+            "NEWSAPI_URL": f"{self.base_url}/newsapi/v2/everything",
+            "FMP_API_URL": f"{self.base_url}/fmp/api/v3",
+            "ARXIV_API_URL": f"{self.base_url}/arxiv/api/query",
+            "YAHOO_CHART_URL": f"{self.base_url}/yahoo/v8/finance/chart",
+            "HF_INFERENCE_URL": f"{self.base_url}/hf",
+            "PIXABAY_API_KEY": "stub",
+            "NEWSAPI_KEY": "stub",
+            "FMP_API_KEY": "stub",
+            "HF_TOKEN": "stub",
+        }
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def load_config(path=None, **default):
+    """Crea la configuración a partir de un JSON {"default": {...}, "hf": {...}, ...}."""
+    overrides = {}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f)
+        default = dict(overrides.pop("default", {}), **default)
+    return StubConfig(default={k: v for k, v in default.items() if v is not None}, overrides=overrides)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Arranca los stubs de las APIs externas.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--config", help="JSON con latencia/jitter/error_rate por servicio")
+    args = parser.parse_args()
+    with StubServer(load_config(args.config), port=args.port) as stubs:
+        for name, value in stubs.environment().items():
+            print(f"export {name}={value}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
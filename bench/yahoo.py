@@ -0,0 +1,46 @@
+"""
+Sustituto mínimo de yfinance para los benchmarks.
+
+yfinance no permite cambiar su URL base, así que los benchmarks reemplazan el módulo
+`yf` de generador.fetchers.markets por este objeto, que implementa `Ticker(...).history` y `download`
+leyendo el endpoint de gráficos de los stubs.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from generador.clients import http_get
+
+
+class _Ticker:
+    def __init__(self, stand_in, symbol):
+        self._stand_in = stand_in
+        self.symbol = symbol
+
+    def history(self, period="1mo", timeout=10, **kwargs):
+        return self._stand_in.history(self.symbol, period, timeout)
+
+
+class YahooStandIn:
+    def __init__(self, chart_url):
+        self.chart_url = chart_url.rstrip("/")
+
+    def history(self, symbol, period="1mo", timeout=10):
+        response = http_get(f"{self.chart_url}/{symbol}", params={"range": period, "interval": "1d"}, timeout=timeout, provider="yahoo")
+        response.raise_for_status()
+        result = response.json()["chart"]["result"][0]
+        quote = result["indicators"]["quote"][0]
+        index = pd.to_datetime(result["timestamp"], unit="s")
+        return pd.DataFrame(
+            {"Open": quote["open"], "High": quote["high"], "Low": quote["low"], "Close": quote["close"], "Volume": quote["volume"]},
+            index=index,
+        )
+
+    def Ticker(self, symbol):
+        return _Ticker(self, symbol)
+
+    def download(self, tickers, period="1mo", group_by="column", threads=True, progress=False, timeout=10, **kwargs):
+        symbols = [tickers] if isinstance(tickers, str) else list(tickers)
+        with ThreadPoolExecutor(max_workers=len(symbols) if threads else 1) as executor:
+            frames = dict(zip(symbols, executor.map(lambda symbol: self.history(symbol, period, timeout), symbols)))
+        return pd.concat(frames, axis=1)
@@ -0,0 +1,12 @@
+"""
+Brilliant Generator: generación de contenido, noticias financieras, datos bursátiles
+y divulgación científica con Streamlit.
+
+La interfaz está en `generador.app` y cada vista en `generador.views`. Las vistas se
+importan la primera vez que se abren, de modo que sus dependencias pesadas (yfinance,
+pandas, huggingface_hub...) no retrasan la carga de la página inicial.
+"""
+from dotenv import load_dotenv
+
+# Cargar variables del entorno antes de que cualquier módulo del paquete lea su configuración
+load_dotenv()
@@ -0,0 +1,48 @@
+"""
+Métricas de comparación de una cesta de empresas a partir de sus cierres diarios.
+
+Todos los cálculos se hacen de una vez sobre la matriz fechas x símbolos, sin
+recorrer los símbolos uno a uno.
+"""
+import numpy as np
+import pandas as pd
+
+# Sesiones bursátiles por año, para anualizar la volatilidad
+TRADING_DAYS = 252
+
+
+def daily_returns(closes):
+    """Rentabilidades logarítmicas diarias de cada columna."""
+    return np.log(closes / closes.shift(1)).iloc[1:]
+
+
+def compare_basket(closes, profiles=None):
+    """
+    Calcula rentabilidad, volatilidad, drawdown y correlaciones de la cesta.
+
+    Args:
+        closes (pandas.DataFrame): Cierres diarios, una columna por símbolo
+        profiles (dict): Símbolo -> perfil de FMP, para añadir nombre, sector y capitalización
+
+    Returns:
+        tuple: (DataFrame con una fila por símbolo, matriz de correlación de las rentabilidades diarias)
+    """
+    closes = closes.sort_index().ffill()
+    returns = daily_returns(closes)
+    first = closes.bfill().iloc[0]
+    last = closes.iloc[-1]
+    summary = pd.DataFrame({
+        "rentabilidad": last / first - 1,
+        "volatilidad anual": returns.std() * np.sqrt(TRADING_DAYS),
+        "máxima caída": (closes / closes.cummax() - 1).min(),
+        "último cierre": last,
+    })
+    summary["rentabilidad/volatilidad"] = summary["rentabilidad"] / summary["volatilidad anual"]
+
+    if profiles:
+        info = pd.DataFrame.from_dict(profiles, orient="index")
+        columns = {"companyName": "empresa", "sector": "sector", "mktCap": "capitalización", "beta": "beta"}
+        info = info.reindex(columns=list(columns)).rename(columns=columns)
+        summary = info.join(summary, how="outer")
+
+    return summary.sort_values("rentabilidad", ascending=False), returns.corr()
@@ -0,0 +1,72 @@
+import streamlit as st
+
+from . import metrics
+from .cache import cache, completion_cache
+from .config import ADMIN_PANEL
+from .prefetch import PREFETCH_ENABLED, scheduler
+from .views import ADMIN_VIEWS, VIEWS, load_view
+
+
+def render_cache_status():
+    # Contadores de la caché compartida de fetchers
+    with st.expander("Estado de la caché"):
+        for source, counters in cache.stats().items():
+            st.caption(
+                f"**{source}**: {counters['hits']} aciertos, {counters['stale_hits']} caducados, "
+                f"{counters['misses']} fallos ({counters['hit_ratio']:.0%})"
+            )
+        completions = completion_cache.stats()
+        st.caption(
+            f"**generaciones**: {completions['memory_hits'] + completions['disk_hits']} aciertos, "
+            f"{completions['misses']} fallos ({completions['hit_ratio']:.0%}), "
+            f"{completions['disk_entries']} entradas, {completions['bytes_stored'] / 1024:.0f} KB"
+        )
+        # El almacén de imágenes (y requests) solo se carga al abrir el panel
+        from .image_store import image_store
+
+        images = image_store.stats()
+        st.caption(f"**imágenes**: {images['urls']} URLs, {images['files']} ficheros, {images['bytes_stored'] / 1024:.0f} KB")
+
+def render_landing():
+    st.markdown("## Brilliant generator ✨")
+    st.markdown("- Genere contenidos para su Blog, Twitter(X), LinkedIn e Instagram.")
+    st.markdown("- Lea noticias financieras.")
+    st.markdown("- Obtenga información financiera de la empresa de su preferencia.")
+    st.markdown("- Consulte los índices bursátiles más importantes.")
+    st.markdown("- Genere contenido científico divulgativo.")
+    st.write("Seleccione una opción en el menú de la derecha para empezar.")
+
+def main():
+    # Endpoint /metrics y volcado a fichero, si están configurados
+    metrics.start_exporters()
+
+    # Precarga de índices y noticias compartida por todas las sesiones; cada rerun cuenta como actividad
+    if PREFETCH_ENABLED:
+        scheduler.start()
+        scheduler.touch()
+
+    # Configuración de la página
+    st.set_page_config(layout="wide")
+
+    views = VIEWS + (ADMIN_VIEWS if ADMIN_PANEL else [])
+    modules = {key: module for key, _, module in views}
+
+    # Layout principal: dos columnas
+    col1, col2 = st.columns([4, 1])
+
+    # Columna derecha: botones del menú
+    with col2:
+        # Cada botón actualiza el estado de la vista sin desaparecer
+        for key, label, _ in views:
+            if st.button(label):
+                st.session_state["current_view"] = key
+        render_cache_status()
+
+    # Columna izquierda: contenido dinámico
+    with col1:
+        current_view = st.session_state.setdefault("current_view", None)
+        if current_view in modules:
+            # El módulo de la vista (y sus dependencias) se importa al abrirla por primera vez
+            load_view(modules[current_view]).render()
+        else:
+            render_landing()
@@ -0,0 +1,337 @@
+"""
+Índice local de los resúmenes de arXiv ya recuperados.
+
+Cada artículo que llega de arXiv se guarda con un vector de su título y resumen en
+una matriz NumPy en disco (abierta con memmap) junto a sus metadatos y las consultas
+que lo trajeron. Una consulta se responde en local cuando el índice la cubre entera:
+
+* es prácticamente la misma que una ya hecha ("física cuántica", "Fisica cuantica"),
+  y se devuelven los artículos que trajo aquella, o
+* tiene tantos vecinos recientes y relevantes como artículos se piden, aunque nunca
+  se haya hecho ("quantum error correction" tras indexar artículos sobre ello).
+
+Por defecto los vectores son n-gramas de caracteres con hashing, que no necesitan
+red ni modelos pero no relacionan idiomas ni sinónimos: un vecino solo cuenta si
+además contiene todos los términos de la consulta, de modo que "física médica" no
+se responde con artículos de física cuántica. Con ARXIV_INDEX_EMBEDDING_MODEL los
+vectores los calcula un modelo de embeddings del endpoint de inferencia (por ejemplo,
+uno multilingüe, que relaciona "computación cuántica" con resúmenes en inglés) y
+basta con superar la similitud mínima.
+"""
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+import numpy as np
+
+from . import metrics
+from .cache import CACHE_DIR
+
+# Se desactiva con ARXIV_INDEX=0 (todas las consultas van a arXiv)
+ARXIV_INDEX_ENABLED = os.getenv("ARXIV_INDEX", "1").lower() not in ("0", "false", "no")
+# Directorio del índice y dimensión de los vectores por hashing
+ARXIV_INDEX_DIR = os.getenv("ARXIV_INDEX_DIR", os.path.join(CACHE_DIR, "arxiv_index"))
+ARXIV_INDEX_DIM = int(os.getenv("ARXIV_INDEX_DIM", "512"))
+# Modelo de embeddings opcional (feature extraction); sin él se usan n-gramas con hashing
+ARXIV_INDEX_EMBEDDING_MODEL = os.getenv("ARXIV_INDEX_EMBEDDING_MODEL")
+# Similitud coseno mínima de un vecino que responde a la consulta; calibrada por tipo de
+# vector (los n-gramas de una consulta corta puntúan bajo frente a un resumen entero)
+ARXIV_INDEX_MIN_SCORE = float(os.getenv("ARXIV_INDEX_MIN_SCORE", "0.8" if ARXIV_INDEX_EMBEDDING_MODEL else "0.15"))
+# Términos mínimos de la consulta para reutilizar vecinos con n-gramas ("física" sola es demasiado amplia)
+ARXIV_INDEX_MIN_TERMS = int(os.getenv("ARXIV_INDEX_MIN_TERMS", "2"))
+# Similitud mínima (n-gramas) entre la consulta y una ya hecha para responder sin arXiv
+ARXIV_INDEX_QUERY_MIN_SCORE = float(os.getenv("ARXIV_INDEX_QUERY_MIN_SCORE", "0.9"))
+# Antigüedad máxima (s) de un artículo indexado para servirlo sin consultar arXiv
+ARXIV_INDEX_MAX_AGE = float(os.getenv("ARXIV_INDEX_MAX_AGE", str(7 * 24 * 60 * 60)))
+
+# Palabras que no cuentan como términos de la consulta
+_STOPWORDS = {
+    "and", "for", "the", "with", "from", "into", "del", "las", "los", "para", "por", "con", "una", "que",
+}
+
+# Versión del formato de los ficheros; un índice de otra versión se descarta
+INDEX_VERSION = 2
+
+
+def _normalize(text):
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    return " ".join("".join(c for c in normalized if not unicodedata.combining(c)).split())
+
+
+def _words(text):
+    return re.findall(r"\w+", _normalize(text))
+
+
+def query_terms(text):
+    """Términos significativos de la consulta, normalizados."""
+    return [word for word in _words(text) if len(word) >= 3 and word not in _STOPWORDS]
+
+
+def hash_embed(text, dim=ARXIV_INDEX_DIM):
+    """Vector de n-gramas de caracteres (3 a 5) con hashing y signo, normalizado."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in _normalize(text).split():
+        padded = f" {word} "
+        for n in (3, 4, 5):
+            for i in range(len(padded) - n + 1):
+                digest = zlib.crc32(padded[i:i + n].encode("utf-8"))
+                vector[digest % dim] += 1.0 if digest & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _remote_embed(text):
+    from .clients import call_with_limit, get_inference_client
+    from .config import HF_TOKEN
+
+    client = get_inference_client(ARXIV_INDEX_EMBEDDING_MODEL, HF_TOKEN)
+    vector = np.asarray(call_with_limit("hf", lambda: client.feature_extraction(text)), dtype=np.float32)
+    # Algunos modelos devuelven un vector por token: se promedian
+    vector = vector.reshape(-1, vector.shape[-1]).mean(axis=0)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def embed(text):
+    return _remote_embed(text) if ARXIV_INDEX_EMBEDDING_MODEL else hash_embed(text)
+
+
+def _article_text(article):
+    return f"{article.get('title', '')}. {article.get('summary', '')}"
+
+
+class ArxivIndex:
+    """
+    Matriz de vectores (float16, en `vectors.npy`) y metadatos (`articles.jsonl`), con
+    las consultas normalizadas que trajeron cada artículo.
+
+    Las escrituras reemplazan los ficheros de forma atómica; los lectores de otros
+    procesos recargan el índice cuando cambia la fecha de modificación.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.embedder = ARXIV_INDEX_EMBEDDING_MODEL or f"hash-{ARXIV_INDEX_DIM}"
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._articles = []
+        self._links = {}
+        self._queries = {}
+        self._loaded_mtime = None
+
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.directory, "vectors.npy")
+
+    @property
+    def _articles_path(self):
+        return os.path.join(self.directory, "articles.jsonl")
+
+    @property
+    def _info_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def _load(self):
+        # Un índice creado con otro modelo de vectores no es comparable y se descarta
+        try:
+            mtime = os.path.getmtime(self._vectors_path)
+            with open(self._info_path, encoding="utf-8") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            self._vectors, self._articles, self._links, self._queries, self._loaded_mtime = None, [], {}, {}, None
+            return
+        if mtime == self._loaded_mtime:
+            return
+        if info.get("embedder") != self.embedder or info.get("version") != INDEX_VERSION:
+            self._vectors, self._articles, self._links, self._queries, self._loaded_mtime = None, [], {}, {}, mtime
+            return
+        with open(self._articles_path, encoding="utf-8") as f:
+            articles = [json.loads(line) for line in f if line.strip()]
+        vectors = np.load(self._vectors_path, mmap_mode="r")
+        if len(vectors) != len(articles):
+            return
+        self._vectors, self._articles = vectors, articles
+        self._links = {entry["article"]["link"]: i for i, entry in enumerate(articles)}
+        self._queries = {}
+        for i, entry in enumerate(articles):
+            for query in entry.get("queries", []):
+                self._queries.setdefault(query, []).append(i)
+        self._loaded_mtime = mtime
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._articles)
+
+    def _scores(self, query):
+        # Similitud de `query` con todos los artículos; los no recientes quedan en -1
+        query_vector = embed(query)
+        with self._lock:
+            self._load()
+            if self._vectors is None or not len(self._articles):
+                return None, []
+            vectors, articles = self._vectors, self._articles
+        if vectors.shape[1] != len(query_vector):
+            return None, []
+        # Los vectores se guardan en float16 para ocupar la mitad; se opera en float32
+        scores = np.asarray(vectors, dtype=np.float32) @ query_vector
+        scores[~self._fresh(articles)] = -1.0
+        return scores, articles
+
+    @staticmethod
+    def _fresh(articles, max_age=ARXIV_INDEX_MAX_AGE):
+        now = time.time()
+        return np.array([now - entry["indexed_at"] <= max_age for entry in articles])
+
+    def search(self, query, k=3, min_score=ARXIV_INDEX_MIN_SCORE):
+        """
+        Devuelve hasta `k` artículos indexados parecidos a `query` y suficientemente recientes.
+
+        Returns:
+            list: Tuplas (similitud, artículo), de mayor a menor similitud
+        """
+        scores, articles = self._scores(query)
+        if scores is None:
+            return []
+        top = np.argsort(-scores)[:k]
+        return [(float(scores[i]), articles[i]["article"]) for i in top if scores[i] >= min_score]
+
+    def matching_query(self, query, min_score=ARXIV_INDEX_QUERY_MIN_SCORE):
+        """
+        Busca entre las consultas ya hechas la más parecida a `query`.
+
+        Returns:
+            tuple: (consulta normalizada, similitud), o (None, 0.0) si ninguna llega a `min_score`
+        """
+        normalized = _normalize(query)
+        with self._lock:
+            self._load()
+            queries = list(self._queries)
+        if normalized in queries:
+            return normalized, 1.0
+        if not queries:
+            return None, 0.0
+        # Siempre con n-gramas: se busca la misma consulta escrita de otra forma, no una parecida en significado
+        similarities = np.vstack([hash_embed(known) for known in queries]) @ hash_embed(normalized)
+        best = int(np.argmax(similarities))
+        if similarities[best] < min_score:
+            return None, float(similarities[best])
+        return queries[best], float(similarities[best])
+
+    def _relevant(self, terms, entry):
+        # Con n-gramas, un vecino solo responde si contiene todos los términos de la consulta
+        if ARXIV_INDEX_EMBEDDING_MODEL:
+            return True
+        if len(terms) < ARXIV_INDEX_MIN_TERMS:
+            return False
+        words = set(_words(_article_text(entry["article"])))
+        return all(term in words for term in terms)
+
+    def answer(self, query, k=3):
+        """
+        Responde `query` en local si el índice la cubre entera.
+
+        Primero van los artículos de una consulta casi idéntica ya hecha (si la hay) y
+        después los vecinos recientes que superan ARXIV_INDEX_MIN_SCORE y, con n-gramas,
+        contienen todos los términos de la consulta.
+
+        Returns:
+            list: `k` artículos, o None si no hay suficientes
+        """
+        scores, articles = self._scores(query)
+        if scores is None:
+            return None
+        known, _ = self.matching_query(query)
+        with self._lock:
+            retrieved = [i for i in self._queries.get(known, []) if i < len(articles)] if known else []
+        retrieved = sorted((i for i in retrieved if scores[i] > -1.0), key=lambda i: -scores[i])
+        terms = query_terms(query)
+        neighbours = []
+        for i in np.argsort(-scores):
+            if len(retrieved) + len(neighbours) >= k or scores[i] < ARXIV_INDEX_MIN_SCORE:
+                break
+            if int(i) not in retrieved and self._relevant(terms, articles[i]):
+                neighbours.append(int(i))
+        chosen = (retrieved + neighbours)[:k]
+        return [articles[i]["article"] for i in chosen] if len(chosen) >= k else None
+
+    def add(self, articles, query=None):
+        """Indexa los artículos nuevos (recuperados con `query`) y actualiza la fecha de los ya presentes."""
+        if not articles:
+            return
+        vectors = [embed(_article_text(article)) for article in articles]
+        normalized = _normalize(query) if query else None
+        with self._lock:
+            self._load()
+            existing = np.asarray(self._vectors) if self._vectors is not None else None
+            entries = list(self._articles)
+            links = dict(self._links)
+            new_vectors = []
+            now = time.time()
+            for article, vector in zip(articles, vectors):
+                position = links.get(article["link"])
+                if position is not None:
+                    queries = list(entries[position].get("queries", []))
+                    if normalized and normalized not in queries:
+                        queries.append(normalized)
+                    entries[position] = {"article": article, "indexed_at": now, "queries": queries}
+                    continue
+                links[article["link"]] = len(entries)
+                entries.append({"article": article, "indexed_at": now, "queries": [normalized] if normalized else []})
+                new_vectors.append(vector.astype(np.float16))
+            if new_vectors:
+                stacked = np.vstack(new_vectors)
+                matrix = np.vstack([existing, stacked]) if existing is not None else stacked
+            else:
+                matrix = existing
+            self._save(matrix, entries)
+
+    def _save(self, matrix, entries):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(f"{self._articles_path}.tmp", "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        with open(f"{self._info_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"embedder": self.embedder, "dim": int(matrix.shape[1]), "version": INDEX_VERSION}, f)
+        with open(f"{self._vectors_path}.tmp", "wb") as f:
+            np.save(f, matrix)
+        os.replace(f"{self._articles_path}.tmp", self._articles_path)
+        os.replace(f"{self._info_path}.tmp", self._info_path)
+        # Los vectores se reemplazan los últimos: su fecha de modificación marca la versión del índice
+        os.replace(f"{self._vectors_path}.tmp", self._vectors_path)
+        self._loaded_mtime = None
+        self._load()
+
+
+def lookup(query, max_results):
+    """
+    Busca en el índice local; solo responde si hay artículos relevantes para toda la consulta.
+
+    Returns:
+        list: `max_results` artículos locales, o None si hay que consultar arXiv
+    """
+    if not ARXIV_INDEX_ENABLED:
+        return None
+    try:
+        articles = index.answer(query, k=max_results)
+    except Exception:
+        articles = None
+    covered = articles is not None
+    metrics.arxiv_index_lookups.inc(outcome="hit" if covered else "miss")
+    return articles if covered else None
+
+
+def remember(query, articles):
+    """Añade al índice los artículos recién recuperados de arXiv (sin interrumpir si falla)."""
+    if not ARXIV_INDEX_ENABLED:
+        return
+    try:
+        index.add(articles, query=query)
+    except (OSError, ValueError):
+        pass
+
+
+index = ArxivIndex(ARXIV_INDEX_DIR)
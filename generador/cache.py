@@ -0,0 +1,346 @@
+import functools
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from .ratelimit import BACKGROUND, priority
+from .singleflight import SingleFlight
+
+# Directorio donde se guarda la caché en disco (compartida entre procesos)
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+# Política por fuente: "ttl" es el tiempo (s) durante el que el dato se considera fresco,
+# "stale" el tiempo adicional durante el que se sirve caducado mientras se refresca en segundo plano
+CACHE_POLICIES = {
+    "indices": {"ttl": 60, "stale": 15 * 60},
+    "news": {"ttl": 10 * 60, "stale": 60 * 60},
+    "profile": {"ttl": 24 * 60 * 60, "stale": 7 * 24 * 60 * 60},
+    "arxiv": {"ttl": 24 * 60 * 60, "stale": 7 * 24 * 60 * 60},
+    "prices": {"ttl": 60 * 60, "stale": 24 * 60 * 60},
+}
+DEFAULT_POLICY = {"ttl": 5 * 60, "stale": 0}
+
+# Entradas de los fetchers que se mantienen en memoria (las menos usadas se leen de disco)
+CACHE_MEMORY_ITEMS = int(os.getenv("CACHE_MEMORY_ITEMS", "512"))
+
+# Límites de la caché de generaciones: entradas en memoria y tamaño máximo en disco
+COMPLETION_CACHE_MEMORY_ITEMS = int(os.getenv("COMPLETION_CACHE_MEMORY_ITEMS", "256"))
+COMPLETION_CACHE_MAX_BYTES = int(os.getenv("COMPLETION_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+
+class TTLCache:
+    """
+    Caché con TTL por fuente, respaldada en SQLite y con stale-while-revalidate.
+
+    Las entradas se guardan en un LRU en memoria y en disco, por lo que la caché se
+    comparte entre sesiones de Streamlit y entre procesos, y sobrevive a los reinicios.
+    Las filas que ya no se pueden servir (más viejas que ttl + stale) se borran al escribir.
+    """
+
+    def __init__(self, path, policies=None, memory_items=CACHE_MEMORY_ITEMS):
+        self.path = path
+        self.policies = policies or CACHE_POLICIES
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._counters = {}
+        self._flight = SingleFlight("cache")
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, source TEXT, stored_at REAL, value BLOB)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_source_stored_at ON cache (source, stored_at)")
+            self._initialized = True
+        return conn
+
+    def _policy(self, source):
+        return self.policies.get(source, DEFAULT_POLICY)
+
+    def _count(self, source, event):
+        with self._lock:
+            counters = self._counters.setdefault(
+                source, {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+            )
+            counters[event] += 1
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _forget(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+
+    def _read(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT stored_at, value FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        entry = (row[0], pickle.loads(row[1]))
+        self._remember(key, entry)
+        return entry
+
+    def _write(self, key, source, value):
+        entry = (time.time(), value)
+        self._remember(key, entry)
+        policy = self._policy(source)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, source, stored_at, value) VALUES (?, ?, ?, ?)",
+                    (key, source, entry[0], pickle.dumps(value)),
+                )
+                # Las entradas de la fuente que ya no se servirían ni caducadas se borran
+                conn.execute(
+                    "DELETE FROM cache WHERE source = ? AND stored_at < ?",
+                    (source, entry[0] - policy["ttl"] - policy["stale"]),
+                )
+        except sqlite3.Error:
+            # Si el disco falla seguimos funcionando solo con la caché en memoria
+            pass
+        return value
+
+    def _refresh(self, key, source, func, args, kwargs):
+        try:
+            # El refresco no tiene a nadie esperando: cede el turno a las peticiones de la interfaz
+            with priority(BACKGROUND):
+                self._write(key, source, func(*args, **kwargs))
+            self._count(source, "refreshes")
+        except Exception:
+            # Se mantiene el dato caducado hasta el próximo intento
+            self._count(source, "errors")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _refresh_in_background(self, key, source, func, args, kwargs):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(
+            target=self._refresh, args=(key, source, func, args, kwargs), daemon=True
+        ).start()
+
+    def get_or_fetch(self, source, func, args=(), kwargs=None):
+        """
+        Devuelve el valor cacheado para la llamada o lo obtiene ejecutando `func`.
+
+        Los errores de `func` solo se propagan cuando no hay ningún dato utilizable.
+        """
+        kwargs = kwargs or {}
+        key = make_key(source, func, args, kwargs)
+        policy = self._policy(source)
+
+        entry = self._read(key)
+        if entry is not None:
+            age = time.time() - entry[0]
+            if age > policy["ttl"]:
+                # Otro proceso puede haber refrescado el dato en disco
+                self._forget(key)
+                entry = self._read(key) or entry
+                age = time.time() - entry[0]
+            if age <= policy["ttl"]:
+                self._count(source, "hits")
+                return entry[1]
+            if age <= policy["ttl"] + policy["stale"]:
+                self._count(source, "stale_hits")
+                self._refresh_in_background(key, source, func, args, kwargs)
+                return entry[1]
+
+        self._count(source, "misses")
+        # Los fallos simultáneos de la misma clave comparten una sola llamada al servicio
+        return self._flight.do(key, lambda: self._write(key, source, func(*args, **kwargs)), group=source)
+
+    def invalidate(self, source=None):
+        """Elimina todas las entradas (o solo las de una fuente)."""
+        with self._lock:
+            if source is None:
+                self._memory.clear()
+            else:
+                for key in [k for k in self._memory if k.startswith(f"{source}:")]:
+                    del self._memory[key]
+        try:
+            with self._connect() as conn:
+                if source is None:
+                    conn.execute("DELETE FROM cache")
+                else:
+                    conn.execute("DELETE FROM cache WHERE source = ?", (source,))
+        except sqlite3.Error:
+            pass
+
+    def stats(self):
+        """Devuelve los contadores de aciertos y fallos por fuente."""
+        with self._lock:
+            stats = {source: dict(counters) for source, counters in self._counters.items()}
+        for counters in stats.values():
+            lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+            counters["hit_ratio"] = (counters["hits"] + counters["stale_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+def make_key(source, func, args, kwargs):
+    call = json.dumps([args, kwargs], sort_keys=True, default=str, ensure_ascii=False)
+    return f"{source}:{func.__module__}.{func.__qualname__}:{call}"
+
+
+# Instancia compartida por todos los fetchers del proceso
+cache = TTLCache(os.path.join(CACHE_DIR, "fetchers.sqlite3"))
+
+
+def cached(source):
+    """Decorador que cachea la función según la política de `source`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return cache.get_or_fetch(source, func, args, kwargs)
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+class CompletionCache:
+    """
+    Caché de generaciones del modelo con dos niveles.
+
+    Un LRU en memoria atiende las repeticiones inmediatas (dobles clics, reruns) y un
+    nivel en SQLite, compartido entre procesos, se limita por tamaño expulsando las
+    entradas usadas hace más tiempo.
+    """
+
+    def __init__(self, path, memory_items=COMPLETION_CACHE_MEMORY_ITEMS, max_bytes=COMPLETION_CACHE_MAX_BYTES):
+        self.path = path
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, value TEXT, size INTEGER, last_access REAL)"
+            )
+            self._initialized = True
+        return conn
+
+    @staticmethod
+    def make_key(model, prompt, max_new_tokens, **params):
+        """Clave normalizada a partir del modelo, el prompt y los parámetros de muestreo."""
+        normalized = {
+            "model": model.strip(),
+            "prompt": unicodedata.normalize("NFC", prompt.strip()),
+            "max_new_tokens": int(max_new_tokens),
+            "params": {name: value for name, value in params.items() if value is not None},
+        }
+        payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return self._memory[key]
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value FROM completions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error:
+            row = None
+        with self._lock:
+            self._counters["disk_hits" if row is not None else "misses"] += 1
+        if row is None:
+            return None
+        self._remember(key, row[0])
+        return row[0]
+
+    def put(self, key, value):
+        self._remember(key, value)
+        size = len(value.encode("utf-8"))
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO completions (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, size, time.time()),
+                )
+                self._evict(conn)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn):
+        # Se expulsan las entradas menos usadas hasta volver por debajo del límite de tamaño
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM completions ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._counters["evictions"] += evicted
+
+    def stats(self):
+        """Devuelve aciertos por nivel, tasa de aciertos y bytes almacenados en disco."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+        try:
+            with self._connect() as conn:
+                stats["disk_entries"], stats["bytes_stored"] = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+                ).fetchone()
+        except sqlite3.Error:
+            stats["disk_entries"], stats["bytes_stored"] = 0, 0
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+# Instancia compartida para las generaciones del modelo
+completion_cache = CompletionCache(os.path.join(CACHE_DIR, "completions.sqlite3"))
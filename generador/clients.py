@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from functools import lru_cache
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import metrics
+from .ratelimit import limiter, parse_retry_after
+
+# Timeouts (s) de conexión y de lectura para las APIs externas
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "15"))
+# Conexiones keep-alive que se mantienen abiertas por host
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+# Reintentos con backoff exponencial ante 5xx; los 429 los gestiona el limitador con Retry-After
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+# Timeout de las llamadas al endpoint de inferencia
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", "120"))
+# Endpoint de inferencia propio (TGI, stubs de bench/...) que sustituye a la API de Hugging Face
+HF_INFERENCE_URL = os.getenv("HF_INFERENCE_URL")
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _build_session():
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=("GET", "HEAD"),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session(url):
+    """Devuelve la sesión HTTP compartida del proceso para el host de `url`."""
+    host = urlsplit(url).netloc
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _sessions[host] = _build_session()
+        return session
+
+
+def http_get(url, params=None, timeout=None, provider=None, **kwargs):
+    """
+    GET con la sesión del host, timeouts por defecto y reintentos ante 5xx.
+
+    Cada petición espera turno en el limitador de `provider` ("newsapi", "fmp"...),
+    que también es su nombre en las métricas; así las URLs configuradas (proxies,
+    stubs) conservan su cuota. Un 429 pausa al proveedor el tiempo indicado en
+    Retry-After y la petición vuelve a la cola. Sin `provider` se usa el host, que
+    no tiene cuota.
+    """
+    timeout = timeout or (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    upstream = provider or urlsplit(url).netloc
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        limiter.acquire(upstream)
+        response = _get(url, upstream, params, timeout, **kwargs)
+        if response.status_code != 429 or attempt == HTTP_MAX_RETRIES:
+            return response
+        limiter.pause(upstream, parse_retry_after(response.headers.get("Retry-After")))
+        response.close()
+
+
+def _get(url, upstream, params, timeout, **kwargs):
+    started_at = time.perf_counter()
+    try:
+        response = get_session(url).get(url, params=params, timeout=timeout, **kwargs)
+    except requests.exceptions.RequestException as e:
+        metrics.observe_request(upstream, time.perf_counter() - started_at, type(e).__name__)
+        raise
+    # Con stream=True el cuerpo aún no se ha leído: se usa Content-Length si está disponible
+    if kwargs.get("stream"):
+        size = int(response.headers["Content-Length"]) if "Content-Length" in response.headers else None
+    else:
+        size = len(response.content)
+    metrics.observe_request(upstream, time.perf_counter() - started_at, response.status_code, size)
+    return response
+
+
+def call_with_limit(provider, func):
+    """
+    Ejecuta `func()` con turno en el limitador de `provider`, reintentando tras un 429.
+
+    Sirve para clientes que no pasan por `http_get`, como el InferenceClient.
+    """
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        limiter.acquire(provider)
+        try:
+            return func()
+        except Exception as e:
+            response = getattr(e, "response", None)
+            if getattr(response, "status_code", None) != 429 or attempt == HTTP_MAX_RETRIES:
+                raise
+            limiter.pause(provider, parse_retry_after(response.headers.get("Retry-After")))
+
+
+@lru_cache(maxsize=32)
+def get_inference_client(model, token=None):
+    """Devuelve un InferenceClient reutilizable para cada (modelo, token)."""
+    # huggingface_hub solo se importa cuando una vista genera texto por primera vez
+    from huggingface_hub import InferenceClient
+
+    return InferenceClient(model=HF_INFERENCE_URL or model, token=token, timeout=INFERENCE_TIMEOUT)
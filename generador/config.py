@@ -0,0 +1,16 @@
+import os
+
+# Las variables de .env ya se han cargado en generador/__init__.py
+PIXABAY_API_KEY = os.getenv("PIXABAY_API_KEY")
+NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
+FMP_API_KEY = os.getenv("FMP_API_KEY")
+HF_TOKEN = os.getenv("HF_TOKEN")
+
+# URLs base de las APIs; se pueden redirigir (por ejemplo, a los stubs de bench/)
+PIXABAY_API_URL = os.getenv("PIXABAY_API_URL", "https://pixabay.com/api/")
+NEWSAPI_URL = os.getenv("NEWSAPI_URL", "https://newsapi.org/v2/everything")
+FMP_API_URL = os.getenv("FMP_API_URL", "https://financialmodelingprep.com/api/v3")
+ARXIV_API_URL = os.getenv("ARXIV_API_URL", "http://export.arxiv.org/api/query")
+
+# Panel de métricas para administradores (se activa con ADMIN_PANEL=1)
+ADMIN_PANEL = os.getenv("ADMIN_PANEL", "").lower() in ("1", "true", "yes")
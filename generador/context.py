@@ -0,0 +1,152 @@
+"""
+Contexto de los prompts científicos con un presupuesto fijo de tokens.
+
+Los resúmenes de arXiv se trocean en frases, cada frase se puntúa por su similitud
+TF-IDF con el área científica pedida y se eligen las mejores hasta llenar el
+presupuesto, contando los tokens con el tokenizador del modelo. Así el tamaño del
+prompt (y con él la latencia y el coste) no depende del número de artículos.
+"""
+import os
+import re
+import unicodedata
+from functools import lru_cache
+import numpy as np
+
+from .config import HF_TOKEN
+from .metrics import estimate_tokens
+
+# Tokens máximos que ocupan los artículos en el prompt científico
+SCIENTIFIC_CONTEXT_TOKENS = int(os.getenv("SCIENTIFIC_CONTEXT_TOKENS", "1500"))
+# Tokenizador con el que se cuentan los tokens (por defecto, el del modelo); "none" usa la estimación
+CONTEXT_TOKENIZER = os.getenv("CONTEXT_TOKENIZER")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-ZÁÉÍÓÚÑ0-9(\"'])")
+_WORD = re.compile(r"\w{2,}")
+
+
+@lru_cache(maxsize=8)
+def _load_tokenizer(name):
+    # Sin el paquete `tokenizers` o sin acceso al Hub se usa la estimación por caracteres
+    try:
+        from tokenizers import Tokenizer
+
+        return Tokenizer.from_pretrained(name, token=HF_TOKEN)
+    except Exception:
+        return None
+
+
+def count_tokens(text, model):
+    """Cuenta los tokens de `text` con el tokenizador de `model`, o los estima si no está disponible."""
+    name = CONTEXT_TOKENIZER or model
+    tokenizer = _load_tokenizer(name) if name.lower() != "none" else None
+    if tokenizer is None:
+        return estimate_tokens(text)
+    return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in _SENTENCE_END.split(" ".join(text.split())) if sentence.strip()]
+
+
+def _terms(text):
+    # Minúsculas y sin tildes, para que "cuántica" y "cuantica" cuenten como el mismo término
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    return _WORD.findall("".join(c for c in normalized if not unicodedata.combining(c)))
+
+
+def rank_sentences(query, sentences):
+    """
+    Puntúa cada frase por su similitud coseno TF-IDF con `query`.
+
+    Returns:
+        numpy.ndarray: Una puntuación por frase, en el mismo orden
+    """
+    documents = [_terms(sentence) for sentence in sentences]
+    vocabulary = {term: i for i, term in enumerate(sorted({term for terms in documents for term in terms}))}
+    if not vocabulary:
+        return np.zeros(len(sentences))
+
+    counts = np.zeros((len(sentences), len(vocabulary)), dtype=np.float32)
+    for row, terms in enumerate(documents):
+        for term in terms:
+            counts[row, vocabulary[term]] += 1
+    idf = np.log((1 + len(sentences)) / (1 + (counts > 0).sum(axis=0))) + 1
+    matrix = counts * idf
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-9
+
+    query_vector = np.zeros(len(vocabulary), dtype=np.float32)
+    for term in _terms(query):
+        if term in vocabulary:
+            query_vector[vocabulary[term]] += 1
+    query_vector *= idf
+    query_vector /= np.linalg.norm(query_vector) + 1e-9
+    return matrix @ query_vector
+
+
+def _assemble(headers, sentences, selected):
+    blocks = []
+    for index, header in enumerate(headers):
+        chosen = [sentence for i, (article, _, sentence) in enumerate(sentences) if article == index and i in selected]
+        if chosen:
+            blocks.append(f"{header} {' '.join(chosen)}")
+    return "\n".join(blocks)
+
+
+def build_context(scientific_area, articles, model, budget=None):
+    """
+    Construye el bloque de artículos del prompt sin superar `budget` tokens.
+
+    Cada artículo conserva su título y las frases de su resumen más relevantes para
+    `scientific_area`, en su orden original. A igual puntuación (o sin coincidencias,
+    por ejemplo si el área está en otro idioma) se prefieren los artículos mejor
+    situados en la búsqueda y las primeras frases de cada resumen. El presupuesto se
+    comprueba sobre el bloque ya montado, separadores incluidos.
+
+    Args:
+        scientific_area (str): Área científica de interés
+        articles (list): Artículos con "title" y "summary"
+        model (str): Modelo cuyo tokenizador se usa para contar
+        budget (int): Tokens máximos (por defecto SCIENTIFIC_CONTEXT_TOKENS)
+
+    Returns:
+        str: Los artículos con el formato "Artículo: ...\\nResumen: ..."
+    """
+    budget = budget or SCIENTIFIC_CONTEXT_TOKENS
+    sentences = [
+        (index, position, sentence)
+        for index, article in enumerate(articles)
+        for position, sentence in enumerate(split_sentences(article["summary"]))
+    ]
+    headers = [f"Artículo: {article['title']}\nResumen:" for article in articles]
+    if not sentences:
+        return ""
+
+    scores = rank_sentences(scientific_area, [sentence for _, _, sentence in sentences])
+    # Orden por puntuación; los empates, por posición del artículo y después de la frase
+    order = np.lexsort((
+        [position for _, position, _ in sentences],
+        [index for index, _, _ in sentences],
+        -np.round(scores, 6),
+    ))
+
+    selected = []
+    started = set()
+    used = 0
+    for i in order:
+        index, _, sentence = sentences[i]
+        # Cada frase paga el espacio que la separa; la primera de un artículo, también su cabecera y el salto de línea
+        cost = count_tokens(f" {sentence}", model)
+        if index not in started:
+            cost += count_tokens(f"\n{headers[index]}" if started else headers[index], model)
+        if used + cost > budget:
+            continue
+        selected.append(int(i))
+        started.add(index)
+        used += cost
+
+    # Los tokenizadores no son aditivos: se recorta sobre el bloque montado hasta que quepa
+    context = _assemble(headers, sentences, set(selected))
+    while selected and count_tokens(context, model) > budget:
+        selected.pop()
+        context = _assemble(headers, sentences, set(selected))
+    return context
@@ -0,0 +1,8 @@
+"""
+Consultas a las APIs externas, una por módulo.
+
+Estas funciones no usan Streamlit: lanzan excepciones y la interfaz decide cómo mostrarlas.
+Así pueden ejecutarse también en los refrescos en segundo plano de la caché. Cada módulo
+importa solo sus dependencias, de modo que, por ejemplo, yfinance (y pandas) se cargan
+únicamente cuando se abre la vista de índices.
+"""
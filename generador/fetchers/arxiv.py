@@ -0,0 +1,101 @@
+import os
+import time
+from xml.etree import ElementTree
+
+from .. import arxiv_index
+from ..cache import cached
+from ..clients import http_get
+from ..config import ARXIV_API_URL
+from ..metrics import timed
+
+# Artículos por petición al paginar y pausa entre páginas (arXiv pide 3 s entre llamadas)
+ARXIV_PAGE_SIZE = int(os.getenv("ARXIV_PAGE_SIZE", "100"))
+ARXIV_PAGE_DELAY = float(os.getenv("ARXIV_PAGE_DELAY", "3"))
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+ARXIV_NS = "{http://arxiv.org/schemas/atom}"
+
+def _text(element, tag):
+    child = element.find(tag)
+    if child is None or child.text is None:
+        return ""
+    return " ".join(child.text.split())
+
+def _parse_arxiv_entry(entry):
+    pdf_url = None
+    for link in entry.iter(f"{ATOM_NS}link"):
+        if link.get("title") == "pdf" or link.get("type") == "application/pdf":
+            pdf_url = link.get("href")
+            break
+    primary_category = entry.find(f"{ARXIV_NS}primary_category")
+    return {
+        "title": _text(entry, f"{ATOM_NS}title"),
+        "summary": _text(entry, f"{ATOM_NS}summary"),
+        "link": _text(entry, f"{ATOM_NS}id"),
+        "authors": [_text(author, f"{ATOM_NS}name") for author in entry.iter(f"{ATOM_NS}author")],
+        "published": _text(entry, f"{ATOM_NS}published"),
+        "primary_category": primary_category.get("term") if primary_category is not None else None,
+        "categories": [category.get("term") for category in entry.iter(f"{ATOM_NS}category")],
+        "pdf_url": pdf_url,
+    }
+
+def parse_arxiv_feed(source):
+    """
+    Recorre un feed Atom de arXiv de forma incremental.
+
+    Cada <entry> se convierte en un artículo en cuanto termina de llegar y se libera
+    a continuación, de modo que la memoria no crece con el número de resultados.
+
+    Args:
+        source: Fichero o flujo de bytes con el XML
+
+    Yields:
+        dict: Artículo con título, resumen, enlace, autores, fecha, categorías y PDF
+    """
+    root = None
+    for event, element in ElementTree.iterparse(source, events=("start", "end")):
+        if root is None:
+            root = element
+        elif event == "end" and element.tag == f"{ATOM_NS}entry":
+            yield _parse_arxiv_entry(element)
+            root.clear()
+
+def iter_arxiv_articles(query, max_results=3, page_size=None):
+    """Genera los artículos más recientes sobre `query`, paginando la API de arXiv."""
+    page_size = min(page_size or ARXIV_PAGE_SIZE, max_results)
+    start = 0
+    while start < max_results:
+        if start:
+            time.sleep(ARXIV_PAGE_DELAY)
+        params = {
+            "search_query": f"all:{query}",
+            "start": start,
+            "max_results": min(page_size, max_results - start),
+            "sortBy": "submittedDate",
+            "sortOrder": "descending",
+        }
+        response = http_get(ARXIV_API_URL, params=params, stream=True, provider="arxiv")
+        received = 0
+        try:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            for article in parse_arxiv_feed(response.raw):
+                received += 1
+                yield article
+        finally:
+            response.close()
+        # Una página incompleta indica que no hay más resultados
+        if received < params["max_results"]:
+            return
+        start += received
+
+@cached("arxiv")
+@timed("fetch_arxiv_articles")
+def fetch_arxiv_articles(query, max_results=3):
+    # Las consultas parecidas a otras ya hechas se responden con el índice local
+    articles = arxiv_index.lookup(query, max_results)
+    if articles is not None:
+        return articles
+    articles = list(iter_arxiv_articles(query, max_results=max_results))
+    arxiv_index.remember(query, articles)
+    return articles
@@ -0,0 +1,13 @@
+from ..clients import http_get
+from ..config import PIXABAY_API_KEY, PIXABAY_API_URL
+from ..metrics import timed
+from ..singleflight import coalesced
+
+@coalesced("pixabay")
+@timed("fetch_image_from_pixabay")
+def fetch_image_from_pixabay(query):
+    params = {"key": PIXABAY_API_KEY, "q": query, "image_type": "photo", "per_page": 3}
+    response = http_get(PIXABAY_API_URL, params=params, provider="pixabay")
+    response.raise_for_status()
+    data = response.json()
+    return [hit["webformatURL"] for hit in data["hits"]]
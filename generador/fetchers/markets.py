@@ -0,0 +1,136 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+import yfinance as yf
+
+from ..cache import cached
+from ..metrics import timed
+
+# Índices que se muestran por defecto; se pueden sustituir con la variable STOCK_INDICES
+DEFAULT_INDICES = {
+    "Dow Jones": "^DJI",
+    "S&P 500": "^GSPC",
+    "Nasdaq": "^IXIC",
+    "FTSE 100": "^FTSE",
+    "DAX": "^GDAXI",
+    "Nikkei 225": "^N225"
+}
+# "batch" descarga todos los símbolos en una sola petición; "pool" los consulta en paralelo
+INDICES_FETCH_MODE = os.getenv("INDICES_FETCH_MODE", "batch")
+INDICES_TIMEOUT = float(os.getenv("INDICES_TIMEOUT", "10"))
+INDICES_MAX_WORKERS = int(os.getenv("INDICES_MAX_WORKERS", "8"))
+
+_indices_executor = ThreadPoolExecutor(max_workers=INDICES_MAX_WORKERS, thread_name_prefix="indices")
+
+def load_indices():
+    """
+    Devuelve los índices configurados en STOCK_INDICES o los predeterminados.
+
+    El formato de la variable es "Nombre=SÍMBOLO" separados por comas,
+    por ejemplo: "Dow Jones=^DJI,IBEX 35=^IBEX".
+    """
+    configured = os.getenv("STOCK_INDICES")
+    if not configured:
+        return dict(DEFAULT_INDICES)
+    indices = {}
+    for item in configured.split(","):
+        name, _, symbol = item.partition("=")
+        if name.strip():
+            indices[name.strip()] = (symbol or name).strip()
+    return indices
+
+def _last_close(closes):
+    closes = closes.dropna()
+    if closes.empty:
+        raise ValueError("sin datos de cierre")
+    return closes.iloc[-1]
+
+@timed("yfinance:download")
+def _download_index_closes(symbols, timeout):
+    # Una sola descarga multi-símbolo; los símbolos sin datos quedan fuera del resultado
+    frame = yf.download(symbols, period="5d", group_by="ticker", threads=True, progress=False, timeout=timeout)
+    closes = {}
+    for symbol in symbols:
+        try:
+            if symbol in frame.columns.get_level_values(0):
+                closes[symbol] = _last_close(frame[symbol]["Close"])
+            elif len(symbols) == 1:
+                closes[symbol] = _last_close(frame["Close"])
+        except (KeyError, ValueError):
+            continue
+    return closes
+
+@timed("yfinance:history")
+def _fetch_index_close(symbol, timeout):
+    history = yf.Ticker(symbol).history(period="5d", timeout=timeout)
+    return _last_close(history["Close"])
+
+def _fetch_index_closes_concurrently(symbols, timeout):
+    # Cada símbolo tiene su propio timeout y su propio error, de modo que uno lento no bloquea al resto
+    futures = {_indices_executor.submit(_fetch_index_close, symbol, timeout): symbol for symbol in symbols}
+    rounds = -(-len(symbols) // INDICES_MAX_WORKERS)
+    done, _ = wait(futures, timeout=timeout * rounds + 1)
+    results = {}
+    for future, symbol in futures.items():
+        if future not in done:
+            future.cancel()
+            results[symbol] = "Error: tiempo de espera agotado"
+        elif future.exception() is not None:
+            results[symbol] = f"Error: {future.exception()}"
+        else:
+            results[symbol] = future.result()
+    return results
+
+@cached("indices")
+@timed("fetch_stock_indices")
+def fetch_stock_indices(indices=None, mode=None, timeout=None):
+    """
+    Obtiene el último cierre de cada índice.
+
+    Args:
+        indices (dict): Nombre visible -> símbolo de Yahoo Finance (por defecto los configurados)
+        mode (str): "batch" (una descarga multi-símbolo) o "pool" (consultas en paralelo)
+        timeout (float): Tiempo máximo de espera por símbolo, en segundos
+
+    Returns:
+        dict: Nombre del índice -> precio, o un texto "Error: ..." si ese símbolo falló
+    """
+    indices = indices or load_indices()
+    mode = mode or INDICES_FETCH_MODE
+    timeout = timeout or INDICES_TIMEOUT
+    symbols = list(dict.fromkeys(indices.values()))
+
+    closes = {}
+    if mode == "batch":
+        try:
+            closes = _download_index_closes(symbols, timeout)
+        except Exception:
+            closes = {}
+    # Los símbolos que la descarga conjunta no resolvió se reintentan individualmente
+    pending = [symbol for symbol in symbols if symbol not in closes]
+    if pending:
+        closes.update(_fetch_index_closes_concurrently(pending, timeout))
+
+    return {name: closes[symbol] for name, symbol in indices.items()}
+
+@cached("prices")
+@timed("fetch_price_history")
+def fetch_price_history(symbols, period="1y"):
+    """
+    Descarga juntos los cierres diarios de varios símbolos.
+
+    Args:
+        symbols (tuple): Símbolos de Yahoo Finance
+        period (str): Periodo de yfinance ("6mo", "1y", "5y"...)
+
+    Returns:
+        pandas.DataFrame: Un cierre por fila (fecha) y columna (símbolo)
+    """
+    symbols = list(symbols)
+    frame = yf.download(symbols, period=period, group_by="ticker", threads=True, progress=False, timeout=INDICES_TIMEOUT)
+    if len(symbols) == 1 and symbols[0] not in frame.columns.get_level_values(0):
+        closes = frame[["Close"]].rename(columns={"Close": symbols[0]})
+    else:
+        available = [symbol for symbol in symbols if symbol in frame.columns.get_level_values(0)]
+        closes = frame.loc[:, [(symbol, "Close") for symbol in available]].droplevel(1, axis=1)
+    # yfinance devuelve columnas vacías para los símbolos desconocidos
+    return closes.dropna(axis=1, how="all")
@@ -0,0 +1,12 @@
+from ..cache import cached
+from ..clients import http_get
+from ..config import NEWSAPI_KEY, NEWSAPI_URL
+from ..metrics import timed
+
+@cached("news")
+@timed("fetch_financial_news")
+def fetch_financial_news():
+    response = http_get(NEWSAPI_URL, params={"q": "finance", "apiKey": NEWSAPI_KEY}, provider="newsapi")
+    response.raise_for_status()
+    data = response.json()
+    return data.get("articles", [])
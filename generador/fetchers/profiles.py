@@ -0,0 +1,49 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from ..cache import cached
+from ..clients import http_get
+from ..config import FMP_API_KEY, FMP_API_URL
+from ..metrics import timed
+
+# Símbolos por petición en el modo de comparación (FMP acepta varios separados por comas)
+FMP_BATCH_SIZE = int(os.getenv("FMP_BATCH_SIZE", "50"))
+FMP_MAX_WORKERS = int(os.getenv("FMP_MAX_WORKERS", "4"))
+
+@cached("profile")
+@timed("fetch_company_profile")
+def fetch_company_profile(symbol):
+    response = http_get(f"{FMP_API_URL}/profile/{symbol}", params={"apikey": FMP_API_KEY}, provider="fmp")
+    response.raise_for_status()
+    data = response.json()
+    return data[0] if data else None
+
+@cached("profile")
+@timed("fetch_company_profiles_batch")
+def _fetch_profile_batch(symbols):
+    response = http_get(f"{FMP_API_URL}/profile/{','.join(symbols)}", params={"apikey": FMP_API_KEY}, provider="fmp")
+    response.raise_for_status()
+    return {profile["symbol"]: profile for profile in response.json() or []}
+
+def fetch_company_profiles(symbols):
+    """
+    Obtiene los perfiles de muchas empresas con peticiones de hasta FMP_BATCH_SIZE símbolos.
+
+    Los lotes se piden en paralelo, de modo que la cesta completa tarda lo mismo que
+    una consulta individual.
+
+    Args:
+        symbols (list): Símbolos bursátiles
+
+    Returns:
+        dict: Símbolo -> perfil (los símbolos desconocidos para FMP no aparecen)
+    """
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    batches = [tuple(symbols[i:i + FMP_BATCH_SIZE]) for i in range(0, len(symbols), FMP_BATCH_SIZE)]
+    profiles = {}
+    if not batches:
+        return profiles
+    with ThreadPoolExecutor(max_workers=min(len(batches), FMP_MAX_WORKERS), thread_name_prefix="fmp") as executor:
+        for batch in executor.map(_fetch_profile_batch, batches):
+            profiles.update(batch)
+    return profiles
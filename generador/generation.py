@@ -0,0 +1,250 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+from .cache import completion_cache
+from .clients import call_with_limit, get_inference_client
+from .config import HF_TOKEN
+from .context import build_context, count_tokens
+from .singleflight import SingleFlight
+
+DEFAULT_MODEL = "mistralai/Mistral-7B-Instruct-v0.3"
+SCIENTIFIC_MODEL = DEFAULT_MODEL
+TEXT_MAX_NEW_TOKENS = 2000
+SCIENTIFIC_MAX_NEW_TOKENS = 2500
+
+# Las generaciones idénticas en curso (mismo modelo, prompt y parámetros) se comparten entre sesiones
+_flight = SingleFlight("llm")
+# Hilo que registra las métricas de las generaciones fuera del camino de la petición
+_metrics_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-metrics")
+
+# Mapeo de instrucciones específicas por idioma
+LANGUAGE_INSTRUCTIONS = {
+    "Español": "Escribe en español, usando un lenguaje claro y accesible para hispanohablantes.",
+    "Inglés": "Write in English, using clear and accessible language for English speakers.",
+    "Francés": "Écrivez en français, en utilisant un langage clair et accessible pour les francophones.",
+    "Alemán": "Schreiben Sie auf Deutsch und verwenden Sie eine klare, für deutschsprachige Leser verständliche Sprache.",
+    "Italiano": "Scrivi in italiano, usando un linguaggio chiaro e accessibile per i parlanti italiani."
+}
+
+
+def build_text_prompt(topic, audience, platform, tone, language, personalization_info):
+    personalization_text = f" La información adicional sobre la empresa o persona es: {personalization_info}." if personalization_info else ""
+    return (
+        f"Escribe un {tone.lower()} post en {language} para {platform} dirigido a {audience}. "
+        f"El tema es: {topic}.{personalization_text}"
+    )
+
+
+def build_scientific_prompt(scientific_area, articles, personalization_info, language, model=SCIENTIFIC_MODEL, context_tokens=None):
+    # Las frases de los resúmenes más relevantes para el área, dentro del presupuesto de tokens
+    article_summaries = build_context(scientific_area, articles, model, budget=context_tokens)
+    # Prompt más detallado que incluye los resúmenes de los artículos
+    return (
+        f"{LANGUAGE_INSTRUCTIONS.get(language, 'Escribe en un lenguaje accesible')} "
+        f"Genera un artículo de divulgación científica sobre {scientific_area} "
+        f"para todo público. Debes incluir información de los siguientes artículos de investigación recientes:\n\n"
+        f"{article_summaries}\n\n"
+        f"Información adicional a considerar: {personalization_info}\n\n"
+        "Estructura el texto de manera que sea comprensible, usa analogías si es necesario, "
+        "y explica los conceptos técnicos de forma sencilla. El objetivo es que una persona sin formación científica pueda entender fácilmente el contenido."
+    )
+
+
+class GenerationStats:
+    """Métricas de una generación en streaming: tiempo hasta el primer token y tokens/s."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self.tokens = 0
+        self.cancelled = False
+        self.cached = False
+
+    def record_token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.tokens += 1
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+
+    @property
+    def time_to_first_token(self):
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def tokens_per_second(self):
+        if self.first_token_at is None or self.tokens < 2:
+            return None
+        elapsed = (self.finished_at or time.perf_counter()) - self.first_token_at
+        return (self.tokens - 1) / elapsed if elapsed > 0 else None
+
+
+def complete(model, prompt, max_new_tokens, use_cache=True, **params):
+    """
+    Genera la respuesta completa en una sola llamada.
+
+    Con `use_cache=False` se omite la caché de generaciones para obtener un muestreo nuevo.
+    Los parámetros adicionales (temperature, top_p...) se pasan a `text_generation`.
+    """
+    key = completion_cache.make_key(model, prompt, max_new_tokens, **params)
+    if use_cache:
+        cached_text = completion_cache.get(key)
+        if cached_text is not None:
+            return cached_text
+    if not use_cache:
+        return _complete_uncached(model, prompt, max_new_tokens, key, **params)
+    return _flight.do(key, lambda: _complete_uncached(model, prompt, max_new_tokens, key, **params))
+
+
+def _observe_generation(model, prompt, duration, completion_tokens, **kwargs):
+    # Contar los tokens del prompt puede descargar el tokenizador del Hub la primera vez:
+    # se hace en segundo plano para no retrasar la generación ni el primer token
+    _metrics_executor.submit(
+        lambda: metrics.observe_generation(model, duration, count_tokens(prompt, model), completion_tokens, **kwargs)
+    )
+
+
+def _error_status(error):
+    # Código HTTP de la respuesta (429, 503...) o, si no la hubo, el tipo de error
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) or type(error).__name__
+
+
+def _complete_uncached(model, prompt, max_new_tokens, key, **params):
+    client = get_inference_client(model, HF_TOKEN)
+    started_at = time.perf_counter()
+    try:
+        response = call_with_limit(
+            "hf", lambda: client.text_generation(prompt, max_new_tokens=max_new_tokens, details=True, **params)
+        )
+    except Exception as e:
+        _observe_generation(model, prompt, time.perf_counter() - started_at, 0, outcome="error", status=_error_status(e))
+        raise
+    text = response.generated_text
+    _observe_generation(model, prompt, time.perf_counter() - started_at, response.details.generated_tokens, status=200)
+    completion_cache.put(key, text)
+    return text
+
+
+def stream_completion(model, prompt, max_new_tokens, stats=None, cancel_event=None, use_cache=True, **params):
+    """
+    Genera la respuesta token a token a medida que la produce el endpoint de inferencia.
+
+    Args:
+        model (str): Modelo de Hugging Face
+        prompt (str): Prompt completo
+        max_new_tokens (int): Límite de tokens a generar
+        stats (GenerationStats): Objeto donde se registran las métricas (opcional)
+        cancel_event (threading.Event): Si se activa, la generación se detiene (opcional)
+        use_cache (bool): Si es False se ignora la caché de generaciones
+        **params: Parámetros de muestreo para `text_generation`
+
+    Yields:
+        str: Cada fragmento de texto generado
+    """
+    stats = stats if stats is not None else GenerationStats()
+    stats.started_at = time.perf_counter()
+    key = completion_cache.make_key(model, prompt, max_new_tokens, **params)
+    if use_cache:
+        cached_text = completion_cache.get(key)
+        if cached_text is not None:
+            # Una respuesta cacheada se entrega de una vez
+            stats.cached = True
+            stats.record_token()
+            stats.finish()
+            yield cached_text
+            return
+
+    # Con caché, quien pide la misma generación mientras está en curso se suma a ella;
+    # "versión nueva" siempre abre su propio stream
+    if use_cache:
+        tokens = _flight.stream(key, lambda: _endpoint_stream(model, prompt, max_new_tokens, key, **params))
+    else:
+        tokens = _endpoint_stream(model, prompt, max_new_tokens, key, **params)
+    try:
+        for token in tokens:
+            if cancel_event is not None and cancel_event.is_set():
+                stats.cancelled = True
+                break
+            stats.record_token()
+            yield token
+    except GeneratorExit:
+        # El consumidor abandonó el stream (por ejemplo, el usuario pulsó "Detener")
+        stats.cancelled = True
+        raise
+    finally:
+        stats.finish()
+        tokens.close()
+
+
+def _endpoint_stream(model, prompt, max_new_tokens, key, **params):
+    # Stream del endpoint de inferencia; registra las métricas y cachea la respuesta si termina
+    stats = GenerationStats()
+    client = get_inference_client(model, HF_TOKEN)
+    try:
+        stream = call_with_limit("hf", lambda: client.text_generation(prompt, max_new_tokens=max_new_tokens, stream=True, **params))
+    except Exception as e:
+        stats.finish()
+        _observe_generation(
+            model, prompt, stats.finished_at - stats.started_at, 0, outcome="error", status=_error_status(e)
+        )
+        raise
+    tokens = []
+    outcome = "error"
+    status = 200
+    try:
+        for token in stream:
+            stats.record_token()
+            tokens.append(token)
+            yield token
+        outcome = "ok"
+    except GeneratorExit:
+        stats.cancelled = True
+        outcome = "cancelled"
+        raise
+    except Exception as e:
+        status = _error_status(e)
+        raise
+    finally:
+        # Cerrar el stream corta la conexión y deja de generar (y facturar) tokens no deseados
+        stats.finish()
+        _observe_generation(
+            model, prompt, stats.finished_at - stats.started_at, stats.tokens,
+            time_to_first_token=stats.time_to_first_token, outcome=outcome, status=status,
+        )
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    # Solo se cachean las generaciones completas
+    completion_cache.put(key, "".join(tokens))
+
+
+def generate_scientific_variants(scientific_area, articles, personalization_info, languages, model=SCIENTIFIC_MODEL, use_cache=True):
+    """
+    Genera el mismo artículo divulgativo en varios idiomas en paralelo.
+
+    Todas las variantes usan el mismo conjunto de artículos como contexto, por lo que
+    la recuperación se hace una sola vez y el tiempo total se acerca al de una generación.
+
+    Returns:
+        dict: Idioma -> {"text": texto generado o None, "error": mensaje o None}
+    """
+    with ThreadPoolExecutor(max_workers=max(len(languages), 1), thread_name_prefix="variants") as executor:
+        futures = {
+            language: executor.submit(
+                complete, model,
+                build_scientific_prompt(scientific_area, articles, personalization_info, language, model=model),
+                SCIENTIFIC_MAX_NEW_TOKENS, use_cache=use_cache,
+            )
+            for language in languages
+        }
+    variants = {}
+    for language, future in futures.items():
+        error = future.exception()
+        variants[language] = {"text": None if error else future.result(), "error": str(error) if error else None}
+    return variants
@@ -0,0 +1,181 @@
+"""
+Histórico local de precios (OHLC diario) de los índices.
+
+Las series se guardan en SQLite, una fila por símbolo y día, y solo se descarga de
+Yahoo Finance lo posterior al último día almacenado. Para dibujar, las series se
+reducen con LTTB (Largest-Triangle-Three-Buckets), que conserva la forma del
+gráfico con unos cientos de puntos aunque la serie tenga décadas.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+import numpy as np
+
+from .cache import CACHE_DIR
+from .metrics import timed
+
+# Base de datos del histórico y años que se descargan la primera vez
+HISTORY_DB = os.getenv("HISTORY_DB", os.path.join(CACHE_DIR, "history.sqlite"))
+HISTORY_YEARS = int(os.getenv("HISTORY_YEARS", "10"))
+# Segundos entre comprobaciones de datos nuevos de un mismo símbolo
+HISTORY_REFRESH_INTERVAL = float(os.getenv("HISTORY_REFRESH_INTERVAL", "3600"))
+# Puntos máximos por serie en los gráficos
+HISTORY_CHART_POINTS = int(os.getenv("HISTORY_CHART_POINTS", "500"))
+
+
+class HistoryStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ohlc ("
+                "symbol TEXT, ts INTEGER, open REAL, high REAL, low REAL, close REAL, volume REAL, "
+                "PRIMARY KEY (symbol, ts)) WITHOUT ROWID"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS checks (symbol TEXT PRIMARY KEY, checked_at REAL)")
+            self._initialized = True
+        return conn
+
+    def last_timestamp(self, symbol):
+        with self._connect() as conn:
+            return conn.execute("SELECT MAX(ts) FROM ohlc WHERE symbol = ?", (symbol,)).fetchone()[0]
+
+    def needs_refresh(self, symbol, interval=HISTORY_REFRESH_INTERVAL):
+        with self._connect() as conn:
+            row = conn.execute("SELECT checked_at FROM checks WHERE symbol = ?", (symbol,)).fetchone()
+        return row is None or time.time() - row[0] > interval
+
+    def mark_checked(self, symbol):
+        """Registra una comprobación de `symbol` aunque no haya traído filas (o haya fallado)."""
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO checks VALUES (?, ?)", (symbol, time.time()))
+
+    def append(self, symbol, frame):
+        """Inserta (o sustituye) las filas diarias de un DataFrame OHLC de yfinance."""
+        rows = [
+            (symbol, int(ts.timestamp()), *(float(row[column]) for column in ("Open", "High", "Low", "Close")),
+             float(row["Volume"]) if "Volume" in row and row["Volume"] == row["Volume"] else None)
+            for ts, row in frame.dropna(subset=["Close"]).iterrows()
+        ]
+        with self._lock, self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO ohlc VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO checks VALUES (?, ?)", (symbol, time.time()))
+        return len(rows)
+
+    def load(self, symbol, start=None):
+        """
+        Devuelve la serie de cierres de `symbol` desde `start` (timestamp en segundos).
+
+        Returns:
+            tuple: (numpy.ndarray de timestamps, numpy.ndarray de cierres)
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT ts, close FROM ohlc WHERE symbol = ? AND ts >= ? ORDER BY ts", (symbol, start or 0)
+            ).fetchall()
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        data = np.array(rows, dtype=np.float64)
+        return data[:, 0].astype(np.int64), data[:, 1]
+
+
+@timed("update_history")
+def update_history(symbol, store=None, force=False):
+    """
+    Descarga los días que faltan de `symbol` desde el último almacenado.
+
+    Returns:
+        int: Filas insertadas o actualizadas (0 si no tocaba comprobar)
+    """
+    from .fetchers import markets
+
+    store = store or history_store
+    if not force and not store.needs_refresh(symbol):
+        return 0
+    last = store.last_timestamp(symbol)
+    if last is None:
+        start = datetime.now(timezone.utc) - timedelta(days=365 * HISTORY_YEARS)
+    else:
+        # Se vuelve a pedir el último día guardado, que pudo quedar incompleto
+        start = datetime.fromtimestamp(last, timezone.utc)
+    try:
+        frame = markets.yf.Ticker(symbol).history(start=start.strftime("%Y-%m-%d"), interval="1d", timeout=markets.INDICES_TIMEOUT)
+    except Exception:
+        # Un símbolo que falla (o no existe) no se vuelve a pedir hasta el siguiente intervalo
+        store.mark_checked(symbol)
+        raise
+    # Un resultado vacío también cuenta como comprobación
+    return store.append(symbol, frame)
+
+
+def update_indices_history(indices=None):
+    """Actualiza el histórico de todos los índices configurados; devuelve {símbolo: filas}."""
+    from .fetchers import markets
+
+    indices = indices or markets.load_indices()
+    updated, errors = {}, {}
+    for symbol in dict.fromkeys(indices.values()):
+        # Un símbolo que falla no impide actualizar el resto
+        try:
+            updated[symbol] = update_history(symbol)
+        except Exception as e:
+            errors[symbol] = e
+    if errors and not updated:
+        raise RuntimeError(f"no se pudo actualizar ningún histórico: {next(iter(errors.values()))}")
+    return updated
+
+
+def lttb(x, y, threshold):
+    """
+    Reduce la serie (x, y) a `threshold` puntos con Largest-Triangle-Three-Buckets.
+
+    Returns:
+        tuple: (x, y) reducidos, conservando el primer y el último punto
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    bucket = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        if end < next_end:
+            average_x, average_y = x[end:next_end].mean(), y[end:next_end].mean()
+        else:
+            average_x, average_y = x[-1], y[-1]
+        # Punto del cubo que forma el triángulo de mayor área con el anterior y la media del siguiente
+        areas = np.abs(
+            (x[previous] - average_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (average_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return x[selected], y[selected]
+
+
+def chart_series(symbol, start=None, points=HISTORY_CHART_POINTS, store=None):
+    """Serie de cierres de `symbol` lista para dibujar: (timestamps, cierres) reducidos a `points`."""
+    timestamps, closes = (store or history_store).load(symbol, start)
+    if not len(timestamps):
+        return timestamps, closes
+    reduced_x, reduced_y = lttb(timestamps, closes, points)
+    return reduced_x.astype(np.int64), reduced_y
+
+
+history_store = HistoryStore(HISTORY_DB)
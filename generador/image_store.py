@@ -0,0 +1,190 @@
+"""
+Almacén local de imágenes direccionado por contenido.
+
+Las imágenes de Pixabay y los logos de las empresas se descargan una sola vez y se
+guardan con el SHA-256 de su contenido como nombre, de modo que la misma imagen
+servida desde URLs distintas ocupa un único fichero. Las miniaturas al tamaño en
+que se muestran se generan en un pool en segundo plano, y el total en disco se
+limita expulsando los ficheros usados hace más tiempo. Los renders repetidos se
+sirven desde disco sin tráfico de red.
+"""
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import CACHE_DIR
+from .clients import http_get
+from .singleflight import SingleFlight
+
+# Directorio del almacén y tamaño máximo que ocupan imágenes y miniaturas
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(CACHE_DIR, "images"))
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+# Hilos que generan miniaturas en segundo plano
+IMAGE_THUMBNAIL_WORKERS = int(os.getenv("IMAGE_THUMBNAIL_WORKERS", "2"))
+
+_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif", "image/webp": ".webp"}
+
+
+class ImageStore:
+    def __init__(self, directory, max_bytes=IMAGE_CACHE_MAX_BYTES, workers=IMAGE_THUMBNAIL_WORKERS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnails")
+        self._flight = SingleFlight("images")
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(self.directory, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.directory, "images.sqlite"), timeout=5)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, digest TEXT, ext TEXT)")
+            # Ancho de cada original, para no generar miniaturas que no lo reducen
+            conn.execute("CREATE TABLE IF NOT EXISTS sizes (digest TEXT PRIMARY KEY, width INTEGER)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "name TEXT PRIMARY KEY, digest TEXT, size INTEGER, last_used REAL)"
+            )
+            self._initialized = True
+        return conn
+
+    def _path(self, name):
+        return os.path.join(self.directory, name[:2], name)
+
+    def _touch(self, conn, name):
+        conn.execute("UPDATE files SET last_used = ? WHERE name = ?", (time.time(), name))
+
+    def _lookup(self, conn, name):
+        row = conn.execute("SELECT 1 FROM files WHERE name = ?", (name,)).fetchone()
+        return row is not None and os.path.exists(self._path(name))
+
+    def _store_file(self, name, digest, data):
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO files (name, digest, size, last_used) VALUES (?, ?, ?, ?)",
+                (name, digest, len(data), time.time()),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for name, size in conn.execute("SELECT name, size FROM files ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+            conn.execute("DELETE FROM files WHERE name = ?", (name,))
+            total -= size
+
+    def _download(self, url):
+        # Descarga la imagen y la guarda por su contenido; devuelve (digest, extensión).
+        # Las CDN de imágenes no cuentan en la cuota de las APIs: "images" no tiene límite
+        response = http_get(url, provider="images")
+        response.raise_for_status()
+        data = response.content
+        digest = hashlib.sha256(data).hexdigest()
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+        ext = _EXTENSIONS.get(content_type) or os.path.splitext(url.split("?")[0])[1].lower() or ".img"
+        with self._connect() as conn:
+            known = self._lookup(conn, digest + ext)
+            conn.execute("INSERT OR REPLACE INTO urls (url, digest, ext) VALUES (?, ?, ?)", (url, digest, ext))
+        if not known:
+            self._store_file(digest + ext, digest, data)
+        return digest, ext
+
+    def _make_thumbnail(self, original, name, digest, width):
+        try:
+            from PIL import Image
+
+            with Image.open(self._path(original)) as image:
+                with self._connect() as conn:
+                    conn.execute("INSERT OR REPLACE INTO sizes (digest, width) VALUES (?, ?)", (digest, image.width))
+                if image.width <= width:
+                    # Reducirla solo guardaría otra copia re-codificada: se sirve el original
+                    return
+                image.thumbnail((width, width * image.height // image.width))
+                output = io.BytesIO()
+                if name.endswith(".jpg"):
+                    image.convert("RGB").save(output, format="JPEG", quality=85, optimize=True)
+                else:
+                    image.convert("RGBA").save(output, format="PNG", optimize=True)
+            self._store_file(name, digest, output.getvalue())
+        except Exception:
+            # Sin miniatura se sigue sirviendo el original
+            pass
+        finally:
+            with self._lock:
+                self._pending.discard(name)
+
+    def _thumbnail_name(self, digest, ext, width):
+        # Las fotos se reducen en JPEG; logos y el resto en PNG, que conserva la transparencia
+        return f"{digest}_{width}{'.jpg' if ext == '.jpg' else '.png'}"
+
+    def _schedule_thumbnail(self, original, name, digest, width):
+        with self._lock:
+            if name in self._pending:
+                return
+            self._pending.add(name)
+        self._executor.submit(self._make_thumbnail, original, name, digest, width)
+
+    def get(self, url, width=None):
+        """
+        Devuelve la ruta local de la imagen de `url`, descargándola la primera vez.
+
+        Con `width` se devuelve la miniatura a ese ancho si ya existe; si no, el original
+        mientras la miniatura se genera en segundo plano.
+
+        Returns:
+            str: Ruta del fichero en disco
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT digest, ext FROM urls WHERE url = ?", (url,)).fetchone()
+        if row is None or not os.path.exists(self._path(row[0] + row[1])):
+            row = self._flight.do(url, lambda: self._download(url))
+        digest, ext = row
+        original = digest + ext
+        with self._connect() as conn:
+            size = conn.execute("SELECT width FROM sizes WHERE digest = ?", (digest,)).fetchone()
+            if width and (size is None or size[0] > width):
+                thumbnail = self._thumbnail_name(digest, ext, width)
+                if self._lookup(conn, thumbnail):
+                    self._touch(conn, thumbnail)
+                    return self._path(thumbnail)
+                self._schedule_thumbnail(original, thumbnail, digest, width)
+            self._touch(conn, original)
+        return self._path(original)
+
+    def stats(self):
+        with self._connect() as conn:
+            files, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files").fetchone()
+            urls = conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+        return {"files": files, "bytes_stored": size, "urls": urls}
+
+
+image_store = ImageStore(IMAGE_CACHE_DIR)
+
+
+def local_image(url, width=None):
+    """Ruta local de la imagen para `st.image`; si no se puede descargar se devuelve la URL."""
+    if not url:
+        return url
+    try:
+        return image_store.get(url, width)
+    except Exception:
+        return url
@@ -0,0 +1,233 @@
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Puerto del endpoint /metrics y fichero donde se vuelcan las métricas (ambos opcionales)
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_FILE = os.getenv("METRICS_FILE")
+METRICS_FILE_INTERVAL = float(os.getenv("METRICS_FILE_INTERVAL", "15"))
+
+# Límites (s) de los buckets de latencia y (bytes) de los de tamaño de respuesta
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.kind = "counter"
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, dict(key), value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    def __init__(self, name, help_text):
+        super().__init__(name, help_text)
+        self.kind = "gauge"
+
+    def set(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.kind = "histogram"
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._values[key] = (counts, total + value)
+
+    def snapshot(self):
+        """Devuelve {etiquetas: (conteos por bucket, suma)} para cada serie."""
+        with self._lock:
+            return {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+
+    def quantile(self, q, **labels):
+        """Aproxima el cuantil `q` interpolando dentro del bucket correspondiente."""
+        counts, _ = self.snapshot().get(tuple(sorted(labels.items())), (None, 0))
+        if not counts or not sum(counts):
+            return None
+        target = q * sum(counts)
+        seen = 0
+        lower = 0.0
+        for count, upper in zip(counts, self.buckets + (float("inf"),)):
+            if seen + count >= target and count:
+                if upper == float("inf"):
+                    return lower
+                return lower + (upper - lower) * (target - seen) / count
+            seen += count
+            lower = upper
+        return lower
+
+    def samples(self):
+        samples = []
+        for key, (counts, total) in self.snapshot().items():
+            labels = dict(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                samples.append((f"{self.name}_bucket", dict(labels, le=le), cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+# Métricas de todas las llamadas externas
+upstream_duration = Histogram("upstream_request_duration_seconds", "Latencia de las peticiones HTTP a APIs externas")
+upstream_bytes = Histogram("upstream_response_bytes", "Tamaño de las respuestas de APIs externas", SIZE_BUCKETS)
+upstream_requests = Counter("upstream_requests_total", "Peticiones a APIs externas por código de estado")
+call_duration = Histogram("call_duration_seconds", "Latencia de cada fetcher y generador")
+llm_time_to_first_token = Histogram("llm_time_to_first_token_seconds", "Tiempo hasta el primer token")
+llm_prompt_tokens = Counter("llm_prompt_tokens_total", "Tokens de prompt enviados al modelo")
+llm_completion_tokens = Counter("llm_completion_tokens_total", "Tokens generados por el modelo")
+coalesced_calls = Counter(
+    "singleflight_calls_total", "Llamadas que fueron al servicio (leader) o compartieron una idéntica en curso (follower)"
+)
+ratelimit_wait = Histogram("ratelimit_wait_seconds", "Espera en la cola del limitador por proveedor y prioridad")
+ratelimit_queue_depth = Gauge("ratelimit_queue_depth", "Peticiones esperando turno en el limitador")
+ratelimit_throttled = Counter("ratelimit_throttled_total", "Respuestas 429 que pausaron al proveedor")
+arxiv_index_lookups = Counter("arxiv_index_lookups_total", "Consultas a arXiv resueltas con el índice local (hit) o no (miss)")
+
+REGISTRY = [
+    upstream_duration, upstream_bytes, upstream_requests, call_duration,
+    llm_time_to_first_token, llm_prompt_tokens, llm_completion_tokens, coalesced_calls,
+    ratelimit_wait, ratelimit_queue_depth, ratelimit_throttled, arxiv_index_lookups,
+]
+
+
+def observe_request(upstream, duration, status, size=None):
+    """Registra una petición HTTP a un servicio externo."""
+    upstream_duration.observe(duration, upstream=upstream, status=str(status))
+    upstream_requests.inc(upstream=upstream, status=str(status))
+    if size is not None:
+        upstream_bytes.observe(size, upstream=upstream)
+
+
+def observe_generation(model, duration, prompt_tokens, completion_tokens, time_to_first_token=None, outcome="ok", status=None):
+    """
+    Registra una llamada al modelo con sus tokens de entrada y salida.
+
+    Con `status` (código HTTP o nombre de la excepción) la llamada cuenta también como
+    petición al servicio "hf", igual que las de las demás APIs.
+    """
+    call_duration.observe(duration, call=f"llm:{model}", outcome=outcome)
+    if status is not None:
+        observe_request("hf", duration, status)
+    llm_prompt_tokens.inc(prompt_tokens, model=model)
+    llm_completion_tokens.inc(completion_tokens, model=model)
+    if time_to_first_token is not None:
+        llm_time_to_first_token.observe(time_to_first_token, model=model)
+
+
+def timed(call):
+    """Decorador que mide la latencia de la función y si terminó bien o con error."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started_at = time.perf_counter()
+            outcome = "error"
+            try:
+                result = func(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                call_duration.observe(time.perf_counter() - started_at, call=call, outcome=outcome)
+        return wrapper
+    return decorator
+
+
+def estimate_tokens(text):
+    # Aproximación de ~4 caracteres por token cuando no se dispone del tokenizador
+    return max(1, len(text) // 4) if text else 0
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        name + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def render_prometheus():
+    """Devuelve todas las métricas en el formato de texto de Prometheus."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _write_metrics_file():
+    while True:
+        tmp_path = f"{METRICS_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(render_prometheus())
+        os.replace(tmp_path, METRICS_FILE)
+        time.sleep(METRICS_FILE_INTERVAL)
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def start_exporters():
+    """Arranca (una sola vez por proceso) el endpoint /metrics y el volcado a fichero configurados."""
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    if METRICS_PORT:
+        server = ThreadingHTTPServer(("0.0.0.0", int(METRICS_PORT)), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True, name="metrics-http").start()
+    if METRICS_FILE:
+        threading.Thread(target=_write_metrics_file, daemon=True, name="metrics-file").start()
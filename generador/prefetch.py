@@ -0,0 +1,178 @@
+"""
+Precarga en segundo plano de los datos comunes a todos los usuarios.
+
+Un hilo por proceso refresca los índices bursátiles y las noticias financieras con
+una cadencia fija y publica el resultado en una instantánea compartida, que las
+vistas leen sin esperar a la red. Los trabajos lentos (el histórico de los índices)
+van en un hilo aparte para no retrasar a los rápidos. Cada trabajo se ejecuta como
+mucho una vez a la vez, aunque una sesión pida refrescarlo mientras corre en segundo
+plano. Si un servicio falla, el siguiente intento se
+retrasa exponencialmente; si no ha habido sesiones activas recientemente, la precarga
+se pausa hasta la próxima visita.
+"""
+import os
+import threading
+import time
+
+from .ratelimit import BACKGROUND, priority
+
+# Se desactiva con PREFETCH=0 (las vistas consultan entonces las APIs al abrirse)
+PREFETCH_ENABLED = os.getenv("PREFETCH", "1").lower() not in ("0", "false", "no")
+# Cadencia (s) de refresco de cada fuente
+PREFETCH_INDICES_INTERVAL = float(os.getenv("PREFETCH_INDICES_INTERVAL", "60"))
+PREFETCH_NEWS_INTERVAL = float(os.getenv("PREFETCH_NEWS_INTERVAL", "600"))
+PREFETCH_HISTORY_INTERVAL = float(os.getenv("PREFETCH_HISTORY_INTERVAL", "3600"))
+# Espera máxima (s) entre reintentos de una fuente que falla
+PREFETCH_MAX_BACKOFF = float(os.getenv("PREFETCH_MAX_BACKOFF", "1800"))
+# Segundos sin sesiones activas tras los que se pausa la precarga
+PREFETCH_IDLE_TIMEOUT = float(os.getenv("PREFETCH_IDLE_TIMEOUT", "900"))
+
+
+def _prefetch_indices():
+    # yfinance se importa aquí, en el hilo de precarga, para no retrasar el arranque
+    from .fetchers import markets
+
+    closes = markets.fetch_stock_indices.uncached()
+    if closes and all(isinstance(value, str) for value in closes.values()):
+        raise RuntimeError("ningún índice disponible")
+    return closes
+
+def _prefetch_news():
+    from .fetchers import news
+
+    return news.fetch_financial_news.uncached()
+
+def _prefetch_history():
+    # Solo se descargan los días posteriores a los ya guardados
+    from .history import update_indices_history
+
+    return update_indices_history()
+
+
+class Snapshot:
+    """Último valor publicado de una fuente, con su antigüedad y el último error."""
+
+    def __init__(self, value=None, updated_at=None, error=None, failures=0):
+        self.value = value
+        self.updated_at = updated_at
+        self.error = error
+        self.failures = failures
+
+    @property
+    def age(self):
+        return time.time() - self.updated_at if self.updated_at is not None else None
+
+
+class _Job:
+    def __init__(self, name, func, interval, lane):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.lane = lane
+        self.next_run = 0.0
+        self.failures = 0
+        # Impide ejecutar el mismo trabajo en dos hilos a la vez
+        self.lock = threading.Lock()
+
+
+class PrefetchScheduler:
+    def __init__(self, idle_timeout=PREFETCH_IDLE_TIMEOUT, max_backoff=PREFETCH_MAX_BACKOFF):
+        self.idle_timeout = idle_timeout
+        self.max_backoff = max_backoff
+        self._jobs = {}
+        self._snapshots = {}
+        self._last_activity = 0.0
+        self._condition = threading.Condition()
+        self._threads = None
+
+    def register(self, name, func, interval, lane="fast"):
+        """Registra un trabajo; los de cada `lane` se ejecutan en serie en un hilo propio."""
+        with self._condition:
+            self._jobs[name] = _Job(name, func, interval, lane)
+
+    def start(self):
+        """Arranca los hilos de precarga (una sola vez por proceso)."""
+        with self._condition:
+            if self._threads is not None:
+                return
+            lanes = dict.fromkeys(job.lane for job in self._jobs.values())
+            self._threads = [
+                threading.Thread(target=self._loop, args=(lane,), daemon=True, name=f"prefetch-{lane}")
+                for lane in lanes
+            ]
+        for thread in self._threads:
+            thread.start()
+
+    def touch(self):
+        """Marca actividad de una sesión; reanuda la precarga si estaba pausada."""
+        with self._condition:
+            self._last_activity = time.monotonic()
+            self._condition.notify_all()
+
+    def get(self, name):
+        """Devuelve la instantánea publicada de `name` o None si aún no hay ninguna."""
+        return self._snapshots.get(name)
+
+    def run_now(self, name):
+        """Refresca `name` en el hilo que llama (p. ej. al pulsar "Actualizar") y devuelve la instantánea."""
+        job = self._jobs[name]
+        requested_at = time.time()
+        with job.lock:
+            # Si la precarga lo estaba refrescando, su resultado ya responde a la petición
+            snapshot = self._snapshots.get(name)
+            if snapshot is None or snapshot.updated_at is None or snapshot.updated_at < requested_at:
+                self._run(job)
+        with self._condition:
+            self._condition.notify_all()
+        return self._snapshots[name]
+
+    def _run(self, job):
+        # Se llama con job.lock tomado
+        previous = self._snapshots.get(job.name) or Snapshot()
+        try:
+            value = job.func()
+        except Exception as e:
+            with self._condition:
+                job.failures += 1
+                # Se conserva el último valor bueno y se espera cada vez más antes de reintentar
+                backoff = min(job.interval * 2 ** job.failures, self.max_backoff)
+                job.next_run = time.monotonic() + backoff
+                self._snapshots[job.name] = Snapshot(previous.value, previous.updated_at, str(e), job.failures)
+            return
+        with self._condition:
+            job.failures = 0
+            job.next_run = time.monotonic() + job.interval
+            self._snapshots[job.name] = Snapshot(value, time.time())
+
+    def _idle(self):
+        return time.monotonic() - self._last_activity > self.idle_timeout
+
+    def _loop(self, lane):
+        while True:
+            with self._condition:
+                while self._idle():
+                    self._condition.wait()
+                now = time.monotonic()
+                jobs = [job for job in self._jobs.values() if job.lane == lane]
+                due = [job for job in jobs if job.next_run <= now]
+                if not due:
+                    next_run = min((job.next_run for job in jobs), default=now + 60)
+                    self._condition.wait(max(0.0, next_run - now))
+                    continue
+            # La precarga cede el turno del limitador a las peticiones de las sesiones
+            with priority(BACKGROUND):
+                for job in due:
+                    # Si una sesión lo está refrescando ahora mismo, no se repite la llamada
+                    if not job.lock.acquire(blocking=False):
+                        continue
+                    try:
+                        self._run(job)
+                    finally:
+                        job.lock.release()
+
+
+scheduler = PrefetchScheduler()
+scheduler.register("indices", _prefetch_indices, PREFETCH_INDICES_INTERVAL)
+scheduler.register("news", _prefetch_news, PREFETCH_NEWS_INTERVAL)
+# Las descargas del histórico pueden tardar: no deben retrasar a índices y noticias
+scheduler.register("history", _prefetch_history, PREFETCH_HISTORY_INTERVAL, lane="slow")
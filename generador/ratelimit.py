@@ -0,0 +1,181 @@
+"""
+Limitador de peticiones por proveedor con cola de prioridad.
+
+Cada proveedor (NewsAPI, FMP, Pixabay, arXiv, inferencia de Hugging Face) tiene un
+token bucket compartido por todo el proceso. Las peticiones que no encuentran token
+esperan en una cola ordenada por prioridad: las de la interfaz pasan antes que las de
+los lotes y las de la precarga en segundo plano. Un 429 con Retry-After pausa al
+proveedor entero durante el tiempo indicado en lugar de reintentar a ciegas.
+"""
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from . import metrics
+
+# Prioridades: un número menor se atiende antes
+INTERACTIVE, BATCH, BACKGROUND = 0, 1, 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch", BACKGROUND: "background"}
+
+# Peticiones por segundo y ráfaga máxima por proveedor, según las cuotas de cada API;
+# se pueden cambiar con RATE_LIMIT_<PROVEEDOR>="peticiones_por_segundo,ráfaga" (p. ej. RATE_LIMIT_FMP="2,5")
+DEFAULT_RATE_LIMITS = {
+    "newsapi": (1.0, 5),
+    "fmp": (5.0, 10),
+    "pixabay": (1.5, 10),
+    "arxiv": (1 / 3, 1),
+    "hf": (5.0, 10),
+}
+# Espera máxima (s) en la cola antes de dar la petición por fallida
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "60"))
+# Pausa (s) aplicada tras un 429 sin cabecera Retry-After
+RATE_LIMIT_DEFAULT_RETRY_AFTER = float(os.getenv("RATE_LIMIT_DEFAULT_RETRY_AFTER", "5"))
+
+_priority = contextvars.ContextVar("ratelimit_priority", default=INTERACTIVE)
+
+
+class RateLimitTimeout(TimeoutError):
+    """
+    La petición no obtuvo turno dentro del tiempo máximo de espera.
+
+    No deriva de `requests.exceptions.RequestException` para no cargar requests con la
+    página inicial (la caché importa este módulo): las vistas la capturan aparte.
+    """
+
+
+@contextlib.contextmanager
+def priority(level):
+    """Fija la prioridad de las peticiones hechas dentro del bloque (en este hilo o contexto)."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+def parse_retry_after(value):
+    """Convierte la cabecera Retry-After (segundos o fecha HTTP) en segundos de espera."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, name, rate, burst):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, level=None, timeout=RATE_LIMIT_MAX_WAIT):
+        """
+        Espera turno y consume un token.
+
+        Returns:
+            float: Segundos de espera en la cola
+        """
+        level = current_priority() if level is None else level
+        started_at = time.monotonic()
+        deadline = started_at + timeout if timeout is not None else None
+        waiter = (level, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._queue, waiter)
+            metrics.ratelimit_queue_depth.set(len(self._queue), provider=self.name)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._queue[0] == waiter and now >= self.blocked_until and self.tokens >= 1:
+                        self.tokens -= 1
+                        break
+                    if deadline is not None and now >= deadline:
+                        raise RateLimitTimeout(f"{self.name}: sin turno tras {timeout:g} s en cola")
+                    # Se despierta cuando haya un token nuevo, termine la pausa o cambie la cola
+                    wake_at = max(self.blocked_until, now + max(0.0, 1 - self.tokens) / self.rate)
+                    if deadline is not None:
+                        wake_at = min(wake_at, deadline)
+                    self._condition.wait(max(0.001, wake_at - now))
+            finally:
+                self._queue.remove(waiter)
+                heapq.heapify(self._queue)
+                metrics.ratelimit_queue_depth.set(len(self._queue), provider=self.name)
+                self._condition.notify_all()
+        waited = time.monotonic() - started_at
+        metrics.ratelimit_wait.observe(waited, provider=self.name, priority=PRIORITY_NAMES.get(level, str(level)))
+        return waited
+
+    def pause(self, seconds):
+        """Detiene al proveedor `seconds` segundos (por ejemplo, tras un 429)."""
+        with self._condition:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self._condition.notify_all()
+        metrics.ratelimit_throttled.inc(provider=self.name)
+
+    def stats(self):
+        with self._condition:
+            self._refill(time.monotonic())
+            return {
+                "queue_depth": len(self._queue),
+                "tokens": round(self.tokens, 2),
+                "paused_for": max(0.0, self.blocked_until - time.monotonic()),
+            }
+
+
+def _load_limits():
+    limits = dict(DEFAULT_RATE_LIMITS)
+    for provider in DEFAULT_RATE_LIMITS:
+        configured = os.getenv(f"RATE_LIMIT_{provider.upper()}")
+        if configured:
+            rate, _, burst = configured.partition(",")
+            limits[provider] = (float(rate), int(burst or 1))
+    return limits
+
+
+class RateLimiter:
+    """Un token bucket por proveedor; los proveedores sin límite configurado no esperan."""
+
+    def __init__(self, limits=None):
+        limits = limits if limits is not None else _load_limits()
+        self.buckets = {name: TokenBucket(name, rate, burst) for name, (rate, burst) in limits.items()}
+
+    def acquire(self, provider, level=None):
+        bucket = self.buckets.get(provider)
+        return bucket.acquire(level) if bucket is not None else 0.0
+
+    def pause(self, provider, retry_after=None):
+        bucket = self.buckets.get(provider)
+        if bucket is not None:
+            bucket.pause(retry_after if retry_after is not None else RATE_LIMIT_DEFAULT_RETRY_AFTER)
+
+    def stats(self):
+        return {name: bucket.stats() for name, bucket in self.buckets.items()}
+
+
+limiter = RateLimiter()
@@ -0,0 +1,169 @@
+"""
+Agrupación de llamadas idénticas en curso (single-flight).
+
+Cuando varias sesiones piden lo mismo a la vez (la misma búsqueda en arXiv, el mismo
+símbolo o el mismo prompt), solo la primera llama al servicio; el resto espera y
+recibe su resultado o su excepción. Las generaciones en streaming se comparten token
+a token: quien llega tarde recibe primero lo ya generado y después el resto en vivo.
+"""
+import contextvars
+import functools
+import threading
+
+from . import metrics
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Broadcast:
+    """Stream producido una sola vez y leído por varios consumidores."""
+
+    def __init__(self):
+        self.items = []
+        self.finished = False
+        self.cancelled = False
+        self.error = None
+        self.readers = 0
+        self.condition = threading.Condition()
+
+    def publish(self, item):
+        with self.condition:
+            self.items.append(item)
+            self.condition.notify_all()
+
+    def finish(self, error=None):
+        with self.condition:
+            self.finished = True
+            self.error = error
+            self.condition.notify_all()
+
+    def read(self):
+        index = 0
+        while True:
+            with self.condition:
+                while index >= len(self.items) and not self.finished:
+                    self.condition.wait()
+                pending = self.items[index:]
+                index = len(self.items)
+                finished = self.finished and index == len(self.items)
+            yield from pending
+            if finished:
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class SingleFlight:
+    def __init__(self, group):
+        self.group = group
+        self._calls = {}
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, group=None):
+        """
+        Ejecuta `func()` una sola vez por `key` entre las llamadas concurrentes.
+
+        Returns:
+            El resultado de la llamada en curso (propia o compartida)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        metrics.coalesced_calls.inc(group=group or self.group, role="leader" if leader else "follower")
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stream(self, key, produce, group=None):
+        """
+        Comparte entre los consumidores concurrentes el stream que genera `produce()`.
+
+        El stream se consume en un hilo propio; si todos los consumidores lo abandonan,
+        se cierra el generador de `produce` para cortar la llamada al servicio.
+
+        Yields:
+            Cada elemento del stream, desde el principio
+        """
+        with self._lock:
+            broadcast = self._streams.get(key)
+            leader = broadcast is None
+            if leader:
+                broadcast = self._streams[key] = _Broadcast()
+            broadcast.readers += 1
+        metrics.coalesced_calls.inc(group=group or self.group, role="leader" if leader else "follower")
+        if leader:
+            # El hilo hereda el contexto del llamante (por ejemplo, su prioridad en el limitador)
+            context = contextvars.copy_context()
+            threading.Thread(
+                target=context.run, args=(self._produce, key, broadcast, produce), daemon=True, name=f"{self.group}-stream"
+            ).start()
+        return self._read(key, broadcast)
+
+    def _produce(self, key, broadcast, produce):
+        error = None
+        source = None
+        try:
+            source = produce()
+            for item in source:
+                if broadcast.cancelled:
+                    break
+                broadcast.publish(item)
+        except Exception as e:
+            error = e
+        finally:
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+            self._forget(key, broadcast)
+            broadcast.finish(error)
+
+    def _read(self, key, broadcast):
+        try:
+            yield from broadcast.read()
+        finally:
+            with self._lock:
+                broadcast.readers -= 1
+                abandoned = broadcast.readers == 0 and not broadcast.finished
+                if abandoned:
+                    # Nadie más lo está leyendo: los que lleguen después empiezan uno nuevo
+                    broadcast.cancelled = True
+                    if self._streams.get(key) is broadcast:
+                        del self._streams[key]
+
+    def _forget(self, key, broadcast):
+        with self._lock:
+            if self._streams.get(key) is broadcast:
+                del self._streams[key]
+
+
+def coalesced(group):
+    """Decorador que agrupa las llamadas concurrentes con los mismos argumentos."""
+    flight = SingleFlight(group)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = repr((args, sorted(kwargs.items())))
+            return flight.do(key, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
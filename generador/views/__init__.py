@@ -0,0 +1,27 @@
+"""
+Vistas de la aplicación.
+
+Cada módulo expone una función `render()` y se importa la primera vez que se abre
+su vista, junto con sus dependencias. `render()` es un fragmento de Streamlit: la
+interacción con sus widgets solo vuelve a ejecutar la vista, y los datos de las APIs
+se cargan una vez por sesión o al pulsar el botón de actualizar.
+"""
+import importlib
+
+# Clave de la vista, texto del botón del menú y módulo que la implementa, en el orden del menú
+VIEWS = [
+    ("content", "Generar Contenido", "content"),
+    ("news", "Ver Noticias Financieras", "news"),
+    ("profile", "Mostrar Perfil de la Empresa", "profile"),
+    ("indices", "Ver Índices Bursátiles", "indices"),
+    ("scientific_content", "Generar Contenido Científico Divulgativo", "scientific"),
+]
+# Vistas que solo aparecen con ADMIN_PANEL=1
+ADMIN_VIEWS = [
+    ("metrics", "Panel de métricas", "metrics_panel"),
+]
+
+
+def load_view(module_name):
+    """Importa el módulo de la vista (solo la primera vez en el proceso) y lo devuelve."""
+    return importlib.import_module(f"{__name__}.{module_name}")
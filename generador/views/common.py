@@ -0,0 +1,71 @@
+import time
+import streamlit as st
+
+from ..prefetch import PREFETCH_ENABLED, scheduler
+
+
+def stream_with_errors(tokens, error_message):
+    # Los errores del endpoint aparecen al iterar el stream, no al crearlo
+    try:
+        yield from tokens
+    except Exception as e:
+        st.error(f"{error_message}: {str(e)}")
+
+def stop_generation():
+    # Pulsar "Detener" provoca un rerun que interrumpe el stream en curso y cierra la conexión
+    st.session_state["generation_stopped"] = True
+
+def show_stopped_notice():
+    if st.session_state.pop("generation_stopped", False):
+        st.info("Generación detenida.")
+
+def render_generation_stream(tokens, stats):
+    """Muestra los tokens a medida que llegan y devuelve el texto completo."""
+    st.button("Detener", on_click=stop_generation)
+    result = st.write_stream(tokens)
+    if stats.cached:
+        st.caption("Respuesta recuperada de la caché de generaciones.")
+    elif stats.time_to_first_token is not None:
+        tokens_per_second = stats.tokens_per_second
+        st.caption(
+            f"Primer token en {stats.time_to_first_token:.2f} s · {stats.tokens} tokens"
+            + (f" · {tokens_per_second:.1f} tokens/s" if tokens_per_second else "")
+        )
+    return result
+
+def load_once(key, loader, refresh=False):
+    """
+    Devuelve los datos de la vista guardados en la sesión.
+
+    `loader` solo se llama la primera vez que se abre la vista o cuando el usuario pide
+    refrescar; los reruns provocados por los widgets reutilizan lo ya cargado.
+
+    Returns:
+        tuple: (datos, instante de la carga)
+    """
+    if refresh or key not in st.session_state:
+        st.session_state[key] = (loader(), time.time())
+    return st.session_state[key]
+
+def render_loaded_at(loaded_at):
+    st.caption(f"Actualizado hace {int(time.time() - loaded_at)} s.")
+
+def load_shared(name, loader, refresh=False):
+    """
+    Devuelve los datos de `name` publicados por la precarga en segundo plano.
+
+    Leer la instantánea no hace peticiones; "Actualizar" la refresca en el momento. Si
+    aún no hay instantánea (precarga desactivada o recién arrancada) se recurre a
+    `loader`, una vez por sesión.
+
+    Returns:
+        tuple: (datos, instante de la carga)
+    """
+    if PREFETCH_ENABLED:
+        scheduler.touch()
+        snapshot = scheduler.run_now(name) if refresh else scheduler.get(name)
+        if snapshot is not None and snapshot.value is not None:
+            if snapshot.error:
+                st.caption(f"Último intento de actualización fallido: {snapshot.error}")
+            return snapshot.value, snapshot.updated_at
+    return load_once(f"{name}_data", loader, refresh=refresh)
@@ -0,0 +1,84 @@
+import threading
+import requests
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from .. import generation
+from ..fetchers import images
+from ..image_store import local_image
+from ..ratelimit import RateLimitTimeout
+from .common import render_generation_stream, show_stopped_notice, stream_with_errors
+
+MODELS = ["mistralai/Mistral-7B-Instruct-v0.3", "tiiuae/falcon-7b-instruct"]
+
+
+def generate_text(topic, audience, platform, tone, language, model, personalization_info, stream=False, stats=None, use_cache=True):
+    prompt = generation.build_text_prompt(topic, audience, platform, tone, language, personalization_info)
+    if stream:
+        return stream_with_errors(
+            generation.stream_completion(model, prompt, generation.TEXT_MAX_NEW_TOKENS, stats=stats, use_cache=use_cache),
+            "Error al generar contenido",
+        )
+    try:
+        return generation.complete(model, prompt, generation.TEXT_MAX_NEW_TOKENS, use_cache=use_cache)
+    except Exception as e:
+        st.error(f"Error al generar contenido: {str(e)}")
+        return None
+
+def fetch_image_from_pixabay(query, container=st):
+    try:
+        found = images.fetch_image_from_pixabay(query)
+    except (requests.exceptions.RequestException, RateLimitTimeout):
+        container.error("Error al conectar con Pixabay.")
+        return []
+    if not found:
+        container.warning("No se encontraron imágenes en Pixabay.")
+    return found
+
+def render_images_in_background(query, container):
+    """Busca y muestra las imágenes en un hilo propio, mientras el texto se sigue generando."""
+    def render():
+        for img_url in fetch_image_from_pixabay(query, container):
+            # Las imágenes de Pixabay (webformatURL, hasta 640 px) ya vienen al tamaño en que se muestran
+            container.image(local_image(img_url), caption="Imagen generada", use_container_width=True)
+
+    thread = threading.Thread(target=render, daemon=True)
+    # El hilo necesita el contexto de la sesión para poder escribir en la página
+    add_script_run_ctx(thread, get_script_run_ctx())
+    thread.start()
+    return thread
+
+@st.fragment
+def render():
+    st.markdown("### Generar Contenido")
+    model_choice = st.selectbox("Selecciona el modelo", MODELS)
+    topic = st.text_input("Tema del contenido")
+    audience = st.text_input("Audiencia objetivo")
+    platform = st.selectbox("Plataforma", ["LinkedIn", "Twitter", "Blog", "Instagram"])
+    tone = st.selectbox("Tono", ["Formal", "Informal", "Técnico", "Inspirador"])
+    language = st.selectbox("Idioma", ["Español", "Inglés", "Francés", "Alemán", "Italiano"])
+    personalization_info = st.text_area("Información adicional")
+    image_prompt = st.text_area("Prompt para imagen")
+    fresh = st.checkbox("Generar una versión nueva (sin caché)")
+
+    show_stopped_notice()
+
+    if st.button("Generar"):
+        stats = generation.GenerationStats()
+        header = st.empty()
+        text_area = st.container()
+        image_area = st.container()
+        # Texto e imágenes son independientes: la búsqueda en Pixabay se lanza a la vez que la generación
+        image_thread = render_images_in_background(image_prompt, image_area) if image_prompt else None
+        with text_area:
+            with st.spinner("Generando contenido..."):
+                result = render_generation_stream(
+                    generate_text(topic, audience, platform, tone, language, model_choice, personalization_info, stream=True, stats=stats, use_cache=not fresh),
+                    stats,
+                )
+        if image_thread is not None:
+            image_thread.join()
+        if result:
+            header.success("Contenido generado:")
+        else:
+            header.warning("No se pudo generar contenido.")
@@ -0,0 +1,63 @@
+import time
+import pandas as pd
+import streamlit as st
+
+from ..cache import cache
+from ..fetchers import markets
+from ..history import chart_series, update_history
+from .common import load_shared, render_loaded_at
+
+# Periodos del gráfico de evolución, en días
+PERIODS = {"1 año": 365, "5 años": 5 * 365, "10 años": 10 * 365}
+
+
+def render_history():
+    st.markdown("#### Evolución")
+    indices = markets.load_indices()
+    selected = st.multiselect("Índices", list(indices), default=list(indices)[:3])
+    period = st.selectbox("Periodo", list(PERIODS), index=1)
+    normalize = st.checkbox("Base 100 al inicio del periodo", value=True)
+    refresh = st.button("Actualizar histórico")
+    if not selected:
+        return
+
+    # El histórico lo mantiene la precarga; la vista solo lo descarga cuando el usuario lo pide
+    if refresh:
+        with st.spinner("Descargando histórico..."):
+            for name in selected:
+                try:
+                    update_history(indices[name], force=True)
+                except Exception as e:
+                    st.warning(f"No se pudo actualizar el histórico de {name}: {e}")
+
+    start = time.time() - PERIODS[period] * 24 * 60 * 60
+    frames, empty = [], []
+    for name in selected:
+        timestamps, closes = chart_series(indices[name], start)
+        if not len(closes):
+            empty.append(name)
+            continue
+        if normalize:
+            closes = closes / closes[0] * 100
+        frames.append(pd.DataFrame({"fecha": pd.to_datetime(timestamps, unit="s"), "índice": name, "valor": closes}))
+    if frames:
+        st.line_chart(pd.concat(frames), x="fecha", y="valor", color="índice")
+        if empty:
+            st.caption(f"Sin histórico descargado: {', '.join(empty)}")
+    else:
+        st.warning("No hay histórico disponible para los índices seleccionados. Pulse \"Actualizar histórico\" para descargarlo.")
+
+@st.fragment
+def render():
+    st.markdown("### Índices Bursátiles")
+    refresh = st.button("Actualizar índices")
+    if refresh:
+        # El usuario pide datos nuevos: se descarta también la copia de la caché compartida
+        cache.invalidate("indices")
+    with st.spinner("Obteniendo índices..."):
+        index_data, loaded_at = load_shared("indices", markets.fetch_stock_indices, refresh=refresh)
+    render_loaded_at(loaded_at)
+    for name, price in index_data.items():
+        st.write(f"{name}: {price}")
+
+    render_history()
@@ -0,0 +1,57 @@
+import streamlit as st
+
+from .. import metrics
+from ..ratelimit import limiter
+
+
+def latency_rows(histogram, label):
+    """Filas con número de llamadas y percentiles de latencia por serie del histograma."""
+    rows = []
+    for key, (counts, total) in sorted(histogram.snapshot().items()):
+        labels = dict(key)
+        calls = sum(counts)
+        rows.append({
+            label: labels.get(label),
+            "estado": labels.get("outcome", labels.get("status", labels.get("priority"))),
+            "llamadas": calls,
+            "media (s)": round(total / calls, 3) if calls else None,
+            **{f"p{int(q * 100)} (s)": round(histogram.quantile(q, **labels), 3) for q in (0.5, 0.95, 0.99)},
+        })
+    return rows
+
+@st.fragment
+def render():
+    st.markdown("### Métricas")
+    st.markdown("#### Fetchers y generadores")
+    st.dataframe(latency_rows(metrics.call_duration, "call"), use_container_width=True)
+    st.markdown("#### Peticiones HTTP por servicio")
+    st.dataframe(latency_rows(metrics.upstream_duration, "upstream"), use_container_width=True)
+    st.markdown("#### Tokens por modelo")
+    prompt_tokens = {labels["model"]: value for _, labels, value in metrics.llm_prompt_tokens.samples()}
+    completion_tokens = {labels["model"]: value for _, labels, value in metrics.llm_completion_tokens.samples()}
+    st.dataframe(
+        [{"modelo": model, "tokens de prompt": prompt_tokens[model], "tokens generados": completion_tokens.get(model, 0)}
+         for model in prompt_tokens],
+        use_container_width=True,
+    )
+    st.markdown("#### Llamadas agrupadas (single-flight)")
+    flights = {}
+    for _, labels, value in metrics.coalesced_calls.samples():
+        flights.setdefault(labels["group"], {"leader": 0, "follower": 0})[labels["role"]] += value
+    st.dataframe(
+        [{"grupo": group, "llamadas al servicio": counts["leader"], "llamadas deduplicadas": counts["follower"]}
+         for group, counts in sorted(flights.items())],
+        use_container_width=True,
+    )
+    st.markdown("#### Limitador por proveedor")
+    st.dataframe(
+        [{"proveedor": provider, "en cola": state["queue_depth"], "tokens disponibles": state["tokens"],
+          "pausado (s)": round(state["paused_for"], 1)}
+         for provider, state in limiter.stats().items()],
+        use_container_width=True,
+    )
+    st.dataframe(latency_rows(metrics.ratelimit_wait, "provider"), use_container_width=True)
+    exposition = metrics.render_prometheus()
+    with st.expander("Formato Prometheus"):
+        st.code(exposition, language="text")
+    st.download_button("Descargar métricas", exposition, file_name="metrics.prom")
@@ -0,0 +1,33 @@
+import requests
+import streamlit as st
+
+from ..cache import cache
+from ..fetchers import news
+from ..ratelimit import RateLimitTimeout
+from .common import load_shared, render_loaded_at
+
+
+def fetch_financial_news():
+    try:
+        return news.fetch_financial_news()
+    except (requests.exceptions.RequestException, RateLimitTimeout) as e:
+        st.error(f"Error al obtener noticias: {e}")
+        return []
+
+@st.fragment
+def render():
+    st.markdown("### Noticias Financieras")
+    refresh = st.button("Actualizar noticias")
+    if refresh:
+        # El usuario pide datos nuevos: se descarta también la copia de la caché compartida
+        cache.invalidate("news")
+    with st.spinner("Obteniendo noticias..."):
+        articles, loaded_at = load_shared("news", fetch_financial_news, refresh=refresh)
+    if articles:
+        render_loaded_at(loaded_at)
+        for article in articles[:5]:
+            st.subheader(article['title'])
+            st.write(article.get('description', ''))
+            st.write(f"[Leer más]({article['url']})")
+    else:
+        st.warning("No se encontraron noticias.")
@@ -0,0 +1,105 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import streamlit as st
+
+from ..fetchers import profiles
+from ..image_store import local_image
+from ..ratelimit import RateLimitTimeout
+
+# Periodos de la comparación (nombre visible -> periodo de yfinance)
+PERIODS = {"6 meses": "6mo", "1 año": "1y", "3 años": "3y", "5 años": "5y"}
+
+
+def fetch_company_profile(symbol):
+    try:
+        return profiles.fetch_company_profile(symbol)
+    except (requests.exceptions.RequestException, RateLimitTimeout) as e:
+        response = getattr(e, "response", None)
+        status = response.status_code if response is not None else e
+        st.error(f"Error al conectar con Financial Modeling Prep: {status}")
+        return None
+
+def parse_symbols(text):
+    return list(dict.fromkeys(symbol.upper() for symbol in re.split(r"[\s,;]+", text) if symbol))
+
+def fetch_basket(symbols, period):
+    """
+    Obtiene a la vez los perfiles (en lotes) y los cierres de toda la cesta.
+
+    Returns:
+        tuple: (perfiles por símbolo, DataFrame de cierres o None)
+    """
+    # yfinance (y pandas) solo se cargan al comparar
+    from ..fetchers import markets
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="basket") as executor:
+        profiles_future = executor.submit(profiles.fetch_company_profiles, symbols)
+        closes_future = executor.submit(markets.fetch_price_history, tuple(symbols), period)
+    try:
+        basket_profiles = profiles_future.result()
+    except (requests.exceptions.RequestException, RateLimitTimeout) as e:
+        st.error(f"Error al conectar con Financial Modeling Prep: {e}")
+        basket_profiles = {}
+    try:
+        closes = closes_future.result()
+    except Exception as e:
+        st.error(f"Error al obtener el histórico de precios: {e}")
+        closes = None
+    return basket_profiles, closes
+
+def render_single():
+    symbol = st.text_input("Símbolo de la empresa (Ej: AAPL)")
+
+    # El perfil solo se consulta al pulsar el botón; escribir en el campo no lanza peticiones
+    if st.button("Mostrar Perfil"):
+        with st.spinner("Obteniendo perfil de la empresa..."):
+            st.session_state["profile_data"] = fetch_company_profile(symbol)
+            if not st.session_state["profile_data"]:
+                st.warning("No se pudo obtener el perfil.")
+
+    profile = st.session_state.get("profile_data")
+    if profile:
+        st.subheader(profile.get("companyName", "Nombre no disponible"))
+        # Miniatura al doble del ancho mostrado para pantallas de alta densidad
+        st.image(local_image(profile.get("image", ""), 200), width=100)
+        st.write(f"**Precio Actual:** ${profile.get('price', 'N/A')}")
+        st.write(f"**Descripción:** {profile.get('description', 'Descripción no disponible')}")
+
+def render_comparison():
+    text = st.text_area("Símbolos separados por comas o espacios (Ej: AAPL, MSFT, GOOGL)")
+    period = st.selectbox("Periodo", list(PERIODS), index=1)
+
+    if st.button("Comparar"):
+        symbols = parse_symbols(text)
+        if len(symbols) < 2:
+            st.warning("Introduzca al menos dos símbolos.")
+        else:
+            with st.spinner(f"Obteniendo {len(symbols)} empresas..."):
+                basket_profiles, closes = fetch_basket(symbols, PERIODS[period])
+            if closes is None or closes.empty:
+                st.session_state.pop("comparison_data", None)
+                st.warning("No se pudo obtener el histórico de precios.")
+            else:
+                # pandas y numpy solo se cargan al comparar
+                from ..analytics import compare_basket
+
+                st.session_state["comparison_data"] = (compare_basket(closes, basket_profiles), set(symbols) - set(closes.columns))
+
+    comparison = st.session_state.get("comparison_data")
+    if comparison:
+        (summary, correlation), missing = comparison
+        if missing:
+            st.caption(f"Sin datos de precios: {', '.join(sorted(missing))}")
+        st.dataframe(summary.round(4), use_container_width=True)
+        st.markdown("#### Correlación de las rentabilidades diarias")
+        st.dataframe(correlation.round(2), use_container_width=True)
+
+@st.fragment
+def render():
+    st.markdown("### Perfil de la Empresa")
+    mode = st.radio("Modo", ["Una empresa", "Comparar varias"], horizontal=True, label_visibility="collapsed")
+    if mode == "Una empresa":
+        render_single()
+    else:
+        render_comparison()
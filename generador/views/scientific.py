@@ -0,0 +1,139 @@
+from xml.etree import ElementTree
+import requests
+import streamlit as st
+
+from .. import generation
+from ..fetchers import arxiv
+from ..ratelimit import RateLimitTimeout
+from .common import render_generation_stream, show_stopped_notice, stream_with_errors
+
+LANGUAGES = ["Español", "Inglés", "Francés", "Alemán", "Italiano"]
+
+
+# Función para obtener artículos de arXiv
+def fetch_arxiv_articles(query, max_results=3):
+    try:
+        return arxiv.fetch_arxiv_articles(query, max_results=max_results)
+    except (requests.exceptions.RequestException, RateLimitTimeout, ElementTree.ParseError) as e:
+        response = getattr(e, "response", None)
+        status = response.status_code if response is not None else e
+        st.error(f"Error al obtener artículos de arXiv: {status}")
+        return []
+
+# Función para generar contenido científico divulgativo, pasando los resúmenes de los artículos como contexto
+def generate_scientific_content_with_context(scientific_area, personalization_info, language, stream=False, stats=None, articles=None, use_cache=True):
+    """
+    Genera contenido divulgativo científico basado en artículos de arXiv.
+    
+    Args:
+        scientific_area (str): Área científica de interés
+        personalization_info (str): Información adicional para personalizar el contenido
+        language (str): Idioma para generar el contenido
+        stream (bool): Si es True devuelve un generador de tokens en lugar del texto completo
+        stats (GenerationStats): Métricas de la generación en streaming (opcional)
+        articles (list): Artículos ya recuperados para usar como contexto (opcional)
+        use_cache (bool): Si es False se genera una versión nueva sin consultar la caché
+    
+    Returns:
+        str: Contenido científico generado para divulgación
+    """
+    # Recuperar artículos sobre el área científica seleccionada
+    if articles is None:
+        articles = fetch_arxiv_articles(scientific_area, max_results=3)
+    
+    # Si no hay artículos, retornar un mensaje de error
+    if not articles:
+        st.warning("No se encontraron artículos relevantes en arXiv.")
+        return None
+    
+    prompt = generation.build_scientific_prompt(scientific_area, articles, personalization_info, language)
+    if stream:
+        return stream_with_errors(
+            generation.stream_completion(generation.SCIENTIFIC_MODEL, prompt, generation.SCIENTIFIC_MAX_NEW_TOKENS, stats=stats, use_cache=use_cache),
+            "Error al generar contenido científico",
+        )
+    try:
+        return generation.complete(generation.SCIENTIFIC_MODEL, prompt, generation.SCIENTIFIC_MAX_NEW_TOKENS, use_cache=use_cache)
+    except Exception as e:
+        st.error(f"Error al generar contenido científico: {str(e)}")
+        return None
+
+def generate_scientific_content_multilanguage(scientific_area, personalization_info, languages, use_cache=True):
+    """
+    Genera el contenido científico en varios idiomas recuperando los artículos una sola vez.
+
+    Returns:
+        tuple: (dict idioma -> texto o None, lista de artículos usados como contexto)
+    """
+    articles = fetch_arxiv_articles(scientific_area, max_results=3)
+    if not articles:
+        st.warning("No se encontraron artículos relevantes en arXiv.")
+        return {}, []
+
+    variants = generation.generate_scientific_variants(scientific_area, articles, personalization_info, languages, use_cache=use_cache)
+    results = {}
+    for language, variant in variants.items():
+        if variant["error"]:
+            st.error(f"Error al generar contenido científico en {language}: {variant['error']}")
+        results[language] = variant["text"]
+    return results, articles
+
+def render_arxiv_articles(articles):
+    # Mostrar los artículos originales de arXiv
+    st.markdown("#### Artículos de investigación consultados:")
+    for article in articles:
+        st.markdown(f"**{article['title']}**")
+        if article.get("authors"):
+            st.caption(f"{', '.join(article['authors'])} · {article.get('published', '')[:10]}")
+        st.write(article['summary'])
+        st.write(f"[Enlace al artículo original]({article['link']})")
+        if article.get("pdf_url"):
+            st.write(f"[PDF]({article['pdf_url']})")
+
+@st.fragment
+def render():
+    st.markdown("### Generar Contenido Científico Divulgativo")
+    scientific_area = st.text_input("Área científica de interés (ej: inteligencia artificial, física cuántica)")
+    languages = st.multiselect("Idiomas del contenido", LANGUAGES, default=["Español"])
+    personalization_info = st.text_area("Información adicional o contexto específico (opcional)")
+    fresh = st.checkbox("Generar una versión nueva (sin caché)")
+
+    show_stopped_notice()
+
+    if st.button("Generar"):
+        if not scientific_area:
+            st.warning("Por favor, ingrese un área científica de interés.")
+        elif not languages:
+            st.warning("Por favor, seleccione al menos un idioma.")
+        elif len(languages) == 1:
+            language = languages[0]
+            stats = generation.GenerationStats()
+            header = st.empty()
+            with st.spinner("Buscando artículos y generando contenido..."):
+                # Los artículos se recuperan una vez y se reutilizan para el prompt y para mostrarlos
+                articles = fetch_arxiv_articles(scientific_area, max_results=3)
+                tokens = generate_scientific_content_with_context(
+                    scientific_area, personalization_info, language, stream=True, stats=stats, articles=articles, use_cache=not fresh
+                )
+                result = render_generation_stream(tokens, stats) if tokens else None
+
+                if result:
+                    header.success(f"Contenido científico generado en {language}:")
+                    render_arxiv_articles(articles)
+                else:
+                    st.warning("No se pudo generar el contenido científico.")
+        else:
+            with st.spinner(f"Buscando artículos y generando contenido en {len(languages)} idiomas..."):
+                results, articles = generate_scientific_content_multilanguage(scientific_area, personalization_info, languages, use_cache=not fresh)
+
+            if any(results.values()):
+                st.success("Contenido científico generado:")
+                for tab, language in zip(st.tabs(languages), languages):
+                    with tab:
+                        if results.get(language):
+                            st.write(results[language])
+                        else:
+                            st.warning(f"No se pudo generar el contenido científico en {language}.")
+                render_arxiv_articles(articles)
+            else:
+                st.warning("No se pudo generar el contenido científico.")
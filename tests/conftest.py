@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Los módulos de generador leen CACHE_DIR al importarse: las pruebas no escriben en .cache
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="generador-tests-"))
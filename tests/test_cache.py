@@ -0,0 +1,124 @@
+import sqlite3
+import time
+
+import pytest
+
+from generador import cache as cache_module
+from generador.cache import TTLCache
+
+POLICIES = {"test": {"ttl": 60, "stale": 120}}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj de la caché controlado por la prueba."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TTLCache(str(tmp_path / "cache.sqlite3"), policies=POLICIES, memory_items=2)
+
+
+def make_source():
+    """Servicio simulado que devuelve un valor distinto en cada llamada, o falla si se le indica."""
+    def fetch(key):
+        fetch.calls += 1
+        if fetch.error is not None:
+            raise fetch.error
+        return f"{key}-{fetch.calls}"
+
+    fetch.calls, fetch.error = 0, None
+    return fetch
+
+
+def wait_for_refresh(cache, count=1):
+    deadline = time.monotonic() + 5
+    while cache.stats()["test"]["refreshes"] + cache.stats()["test"]["errors"] < count:
+        assert time.monotonic() < deadline, "el refresco en segundo plano no terminó"
+        time.sleep(0.005)
+
+
+def test_fresh_entries_are_hits(cache, clock):
+    source = make_source()
+    assert cache.get_or_fetch("test", source, ("a",)) == "a-1"
+    clock[0] += 59
+    assert cache.get_or_fetch("test", source, ("a",)) == "a-1"
+
+    assert source.calls == 1
+    assert cache.stats()["test"]["hits"] == 1
+    assert cache.stats()["test"]["misses"] == 1
+
+
+def test_stale_entries_are_served_while_refreshing(cache, clock):
+    source = make_source()
+    cache.get_or_fetch("test", source, ("a",))
+    clock[0] += 61
+
+    assert cache.get_or_fetch("test", source, ("a",)) == "a-1"
+    wait_for_refresh(cache)
+    assert cache.get_or_fetch("test", source, ("a",)) == "a-2"
+    assert cache.stats()["test"]["stale_hits"] == 1
+
+
+def test_failed_refresh_keeps_the_stale_value(cache, clock):
+    source = make_source()
+    cache.get_or_fetch("test", source, ("a",))
+    clock[0] += 61
+    source.error = RuntimeError("servicio caído")
+
+    assert cache.get_or_fetch("test", source, ("a",)) == "a-1"
+    wait_for_refresh(cache)
+    assert cache.stats()["test"]["errors"] == 1
+    assert cache.get_or_fetch("test", source, ("a",)) == "a-1"
+
+
+def test_expired_entries_are_fetched_again(cache, clock):
+    source = make_source()
+    cache.get_or_fetch("test", source, ("a",))
+    clock[0] += 181
+
+    assert cache.get_or_fetch("test", source, ("a",)) == "a-2"
+    assert cache.stats()["test"]["misses"] == 2
+
+
+def test_errors_propagate_without_usable_data(cache, clock):
+    source = make_source()
+    source.error = RuntimeError("servicio caído")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch("test", source, ("a",))
+
+
+def test_memory_keeps_the_most_recent_entries(cache, clock):
+    source = make_source()
+    for key in ("a", "b", "c"):
+        cache.get_or_fetch("test", source, (key,))
+    assert len(cache._memory) == 2
+    assert not any('["a"]' in key for key in cache._memory)
+
+    # La entrada expulsada de memoria se sigue sirviendo desde disco
+    assert cache.get_or_fetch("test", source, ("a",)) == "a-1"
+    assert source.calls == 3
+    assert any('["a"]' in key for key in cache._memory)
+
+
+def test_writes_purge_rows_that_can_no_longer_be_served(cache, clock):
+    source = make_source()
+    cache.get_or_fetch("test", source, ("a",))
+    clock[0] += 181
+    cache.get_or_fetch("test", source, ("b",))
+
+    with sqlite3.connect(cache.path) as conn:
+        keys = [key for (key,) in conn.execute("SELECT key FROM cache")]
+    assert len(keys) == 1 and '["b"]' in keys[0]
+
+
+def test_invalidate_drops_a_source(cache, clock):
+    source = make_source()
+    cache.get_or_fetch("test", source, ("a",))
+    cache.invalidate("test")
+
+    assert cache.get_or_fetch("test", source, ("a",)) == "a-2"
@@ -0,0 +1,31 @@
+import numpy as np
+
+from generador.history import lttb
+
+
+def test_short_series_are_returned_unchanged():
+    x, y = [1, 2, 3], [4.0, 5.0, 6.0]
+    assert lttb(x, y, 10) == (x, y)
+    assert lttb(x, y, 2) == (x, y)
+
+
+def test_reduces_to_threshold_keeping_the_ends():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+    reduced_x, reduced_y = lttb(x, y, 100)
+
+    assert len(reduced_x) == len(reduced_y) == 100
+    assert reduced_x[0] == 0 and reduced_x[-1] == 999
+    assert np.all(np.diff(reduced_x) > 0)
+    # Solo se eligen puntos de la serie original
+    assert np.array_equal(reduced_y, y[reduced_x.astype(int)])
+
+
+def test_keeps_isolated_peaks():
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[437], y[712] = 10.0, -8.0
+    reduced_x, reduced_y = lttb(x, y, 20)
+
+    assert 437 in reduced_x and 712 in reduced_x
+    assert reduced_y.max() == 10.0 and reduced_y.min() == -8.0
@@ -0,0 +1,109 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from generador import clients
+from generador.ratelimit import (
+    BACKGROUND, BATCH, INTERACTIVE, RateLimiter, RateLimitTimeout, TokenBucket, parse_retry_after, priority,
+)
+
+
+def wait_for_queue(bucket, depth):
+    deadline = time.monotonic() + 5
+    while bucket.stats()["queue_depth"] < depth:
+        assert time.monotonic() < deadline, "las peticiones no llegaron a la cola"
+        time.sleep(0.005)
+
+
+def test_bucket_serves_by_priority_then_arrival():
+    bucket = TokenBucket("test", rate=20, burst=1)
+    # Sin tokens durante la pausa: todas las peticiones esperan en la cola
+    bucket.pause(0.2)
+    served = []
+    lock = threading.Lock()
+
+    def request(name, level):
+        bucket.acquire(level, timeout=5)
+        with lock:
+            served.append(name)
+
+    threads = []
+    for name, level in [("fondo", BACKGROUND), ("lote-1", BATCH), ("interfaz", INTERACTIVE), ("lote-2", BATCH)]:
+        thread = threading.Thread(target=request, args=(name, level), daemon=True)
+        thread.start()
+        threads.append(thread)
+        wait_for_queue(bucket, len(threads))
+    for thread in threads:
+        thread.join(5)
+
+    assert served == ["interfaz", "lote-1", "lote-2", "fondo"]
+
+
+def test_priority_context_sets_the_default_level():
+    bucket = TokenBucket("test", rate=20, burst=1)
+    bucket.pause(0.2)
+    served = []
+
+    def request(name, level):
+        with priority(level):
+            bucket.acquire(timeout=5)
+        served.append(name)
+
+    background = threading.Thread(target=request, args=("fondo", BACKGROUND), daemon=True)
+    background.start()
+    wait_for_queue(bucket, 1)
+    interactive = threading.Thread(target=request, args=("interfaz", INTERACTIVE), daemon=True)
+    interactive.start()
+    wait_for_queue(bucket, 2)
+    background.join(5)
+    interactive.join(5)
+
+    assert served == ["interfaz", "fondo"]
+
+
+def test_acquire_times_out():
+    bucket = TokenBucket("test", rate=1, burst=1)
+    bucket.acquire(timeout=1)
+    with pytest.raises(RateLimitTimeout):
+        bucket.acquire(timeout=0.05)
+    assert bucket.stats()["queue_depth"] == 0
+
+
+def test_pause_blocks_the_provider():
+    bucket = TokenBucket("test", rate=1000, burst=10)
+    bucket.pause(0.2)
+    assert bucket.acquire(timeout=5) >= 0.19
+
+
+@pytest.mark.parametrize("value, expected", [("3", 3.0), ("0.5", 0.5), ("-2", 0.0), (None, None), ("", None), ("pronto", None)])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 <= parse_retry_after(format_datetime(when, usegmt=True)) <= 30
+
+
+class TooManyRequests(Exception):
+    def __init__(self, retry_after):
+        super().__init__("429")
+        self.response = type("Response", (), {"status_code": 429, "headers": {"Retry-After": retry_after}})()
+
+
+def test_call_with_limit_waits_for_retry_after(monkeypatch):
+    monkeypatch.setattr(clients, "limiter", RateLimiter({"test": (1000, 10)}))
+    attempts = []
+
+    def call():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise TooManyRequests("0.2")
+        return "ok"
+
+    assert clients.call_with_limit("test", call) == "ok"
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 0.19
@@ -0,0 +1,157 @@
+import threading
+
+import pytest
+
+from generador import metrics
+from generador.singleflight import SingleFlight
+
+
+@pytest.fixture
+def followers(monkeypatch):
+    """Semáforo que se libera cada vez que una llamada se une a otra en curso."""
+    joined = threading.Semaphore(0)
+    inc = metrics.coalesced_calls.inc
+
+    def counting_inc(amount=1, **labels):
+        inc(amount, **labels)
+        if labels.get("role") == "follower":
+            joined.release()
+
+    monkeypatch.setattr(metrics.coalesced_calls, "inc", counting_inc)
+    return joined
+
+
+def run_in_thread(func):
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = func()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def test_do_shares_result_with_followers(followers):
+    flight = SingleFlight("test")
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "dato"
+
+    leader, leader_outcome = run_in_thread(lambda: flight.do("clave", slow))
+    follower, follower_outcome = run_in_thread(lambda: flight.do("clave", slow))
+    assert followers.acquire(timeout=5)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert calls == [1]
+    assert leader_outcome["result"] == follower_outcome["result"] == "dato"
+
+
+def test_do_propagates_leader_error_to_followers(followers):
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise ValueError("servicio caído")
+
+    leader, leader_outcome = run_in_thread(lambda: flight.do("clave", failing))
+    follower, follower_outcome = run_in_thread(lambda: flight.do("clave", lambda: "no debería llamarse"))
+    assert followers.acquire(timeout=5)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert isinstance(leader_outcome["error"], ValueError)
+    assert follower_outcome["error"] is leader_outcome["error"]
+    # La clave se libera: la siguiente llamada vuelve al servicio
+    assert flight.do("clave", lambda: "nuevo") == "nuevo"
+
+
+def test_stream_is_shared_from_the_start():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def produce():
+        yield "a"
+        release.wait(5)
+        yield "b"
+        yield "c"
+
+    first = flight.stream("clave", produce)
+    assert next(first) == "a"
+    # Quien llega tarde recibe también lo ya generado
+    second = flight.stream("clave", lambda: iter(["no debería usarse"]))
+    release.set()
+    assert list(first) == ["b", "c"]
+    assert list(second) == ["a", "b", "c"]
+
+
+def test_stream_error_reaches_every_reader():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def produce():
+        yield "a"
+        release.wait(5)
+        raise RuntimeError("corte del endpoint")
+
+    first = flight.stream("clave", produce)
+    second = flight.stream("clave", produce)
+    release.set()
+    for reader in (first, second):
+        assert next(reader) == "a"
+        with pytest.raises(RuntimeError, match="corte del endpoint"):
+            next(reader)
+
+
+def test_abandoned_stream_closes_the_source():
+    flight = SingleFlight("test")
+    closed = threading.Event()
+
+    def produce():
+        try:
+            while True:
+                yield "token"
+        finally:
+            closed.set()
+
+    reader = flight.stream("clave", produce)
+    assert next(reader) == "token"
+    reader.close()
+
+    assert closed.wait(5)
+    # Quien llegue después empieza un stream nuevo en lugar de unirse al cancelado
+    assert list(flight.stream("clave", lambda: iter(["nuevo"]))) == ["nuevo"]
+
+
+def test_stream_continues_while_a_reader_remains():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    closed = threading.Event()
+
+    def produce():
+        try:
+            yield "a"
+            release.wait(5)
+            yield "b"
+        finally:
+            closed.set()
+
+    first = flight.stream("clave", produce)
+    second = flight.stream("clave", produce)
+    assert next(first) == "a"
+    first.close()
+    release.set()
+
+    assert list(second) == ["a", "b"]
+    assert closed.wait(5)